@@ -1,11 +1,112 @@
+import time
+
+# Início da importação do módulo, para medir o tempo de inicialização
+INICIO_IMPORTACAO = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import datetime
+import importlib
+import threading
 import os
+import re
+import base64
+import json
+import io
+from collections import OrderedDict
+
+from simulacao_perdas import (
+    preparar_parametros,
+    simular_perdas,
+    calcular_metricas_risco,
+    calcular_curva_excedencia,
+    calcular_coeficientes_perda,
+    calcular_perdas_sem_registro
+)
+from deteccao_anomalias import (
+    criar_detector,
+    alimentar_detector,
+    listar_alertas,
+    LIMIAR_DESVIOS
+)
+
+# Níveis de risco em ordem crescente de severidade
+NIVEIS_RISCO = ['Baixo', 'Médio', 'Alto', 'Extremo']
+
+# Maior pontuação (probabilidade x impacto) de cada nível, exceto Extremo
+LIMITES_NIVEL_RISCO = [4, 10, 16]
+
+# Algarismos significativos preservados nos dados enviados aos gráficos (None desativa o arredondamento)
+PRECISAO_GRAFICOS = 6
+
+# Gráficos enviados sem arredondamento (a cauda da curva de excedência tem probabilidades muito pequenas)
+GRAFICOS_SEM_ARREDONDAMENTO = {'excedencia'}
+
+# Casas decimais sempre preservadas, para que valores monetários nunca percam os centavos
+CASAS_DECIMAIS_MINIMAS = 2
+
+# Arrays numéricos a partir deste tamanho são sempre enviados como buffers binários;
+# os menores seguem no formato (lista ou buffer) que resultar menor
+LIMITE_ARRAY_BINARIO = 64
+
+# Subplots do template e os tipos de trace que os utilizam
+SUBPLOTS_TEMPLATE = {
+    'polar': {'scatterpolar', 'scatterpolargl', 'barpolar'},
+    'ternary': {'scatterternary'},
+    'scene': {'scatter3d', 'surface', 'mesh3d', 'cone', 'streamtube', 'isosurface', 'volume'},
+    'geo': {'scattergeo', 'choropleth'}
+}
+
+# Tipos inteiros aceitos pelos typed arrays do plotly.js, do menor para o maior
+TIPOS_INTEIROS_BINARIOS = ['i1', 'u1', 'i2', 'u2', 'i4', 'u4']
+
+# Número máximo de resultados mantidos nos caches do motor de cenários
+MAXIMO_CACHE_CATEGORIAS = 4096
+MAXIMO_CACHE_CENARIOS = 512
+
+# Páginas do dashboard
+PAGINAS = ["Visão Geral", "Análise de Incidentes", "Matriz de Risco", "Desempenho do Sistema", "Análise Financeira",
+           "Análise Cruzada", "Simulação de Perdas", "Cenários de Controles", "Alertas de Anomalias"]
+
+# Valores padrão dos controles das páginas (as figuras com esses valores são pré-calculadas)
+LIMITE_PRECISAO_PADRAO = 60
+CENARIOS_PADRAO = 250_000
+SEMENTE_PADRAO = 42
+
+# Agrupamentos disponíveis para o detector de anomalias (o primeiro é o padrão)
+AGRUPAMENTOS_ANOMALIAS = [('Local', 'Categoria_Risco'), ('Subcategoria',)]
+
+# Menor limiar selecionável: o detector registra os alertas a partir dele e a página filtra pelo limiar escolhido
+LIMIAR_MINIMO_ANOMALIAS = 2.0
+
+# Aquecimento dos caches na primeira execução do processo (DASHBOARD_AQUECIMENTO=0 desativa)
+AQUECIMENTO_ATIVO = os.environ.get("DASHBOARD_AQUECIMENTO", "1") != "0"
+
+# Tempos de inicialização do processo, compartilhados entre sessões
+@st.cache_resource(show_spinner=False)
+def tempos_inicializacao():
+    return {}
+
+# Função para registrar um tempo de inicialização (mantém a primeira medição do processo)
+def registrar_tempo_inicializacao(etapa, duracao):
+    tempos_inicializacao().setdefault(etapa, duracao)
+
+# Módulo importado apenas no primeiro uso, para não pagar a importação do plotly ao iniciar
+class ModuloTardio:
+    def __init__(self, nome):
+        self.nome = nome
+        self.modulo = None
+    
+    def __getattr__(self, atributo):
+        if self.modulo is None:
+            inicio = time.perf_counter()
+            self.modulo = importlib.import_module(self.nome)
+            registrar_tempo_inicializacao(f"Importação de {self.nome}", time.perf_counter() - inicio)
+        return getattr(self.modulo, atributo)
+
+px = ModuloTardio("plotly.express")
+go = ModuloTardio("plotly.graph_objects")
+pio = ModuloTardio("plotly.io")
 
 # Configuração da página
 st.set_page_config(
@@ -15,6 +116,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+registrar_tempo_inicializacao("Importação do módulo", time.perf_counter() - INICIO_IMPORTACAO)
+
 # Função para carregar os dados
 @st.cache_data
 def carregar_dados():
@@ -35,22 +138,298 @@ def carregar_dados():
         
         df_riscos['Prazo'] = pd.to_datetime(df_riscos['Prazo'])
         
+        # Níveis de risco como categorias ordenadas (códigos int8 na ordem de severidade)
+        tipo_nivel = pd.CategoricalDtype(NIVEIS_RISCO, ordered=True)
+        df_riscos['Nivel_Risco'] = df_riscos['Nivel_Risco'].astype(tipo_nivel)
+        df_riscos['Nivel_Risco_Residual'] = df_riscos['Nivel_Risco_Residual'].astype(tipo_nivel)
+        
+        # Chave de ordenação composta: nível, probabilidade e impacto
+        df_riscos['Chave_Ordenacao'] = (
+            df_riscos['Nivel_Risco'].cat.codes.astype(np.int16) * 100
+            + df_riscos['Probabilidade'].astype(np.int16) * 10
+            + df_riscos['Impacto'].astype(np.int16)
+        )
+        
         return df_incidentes, df_riscos, df_metricas, df_componentes
     
     except Exception as e:
         st.error(f"Erro ao carregar os dados: {e}")
         return None, None, None, None
 
+# Colunas de cada conjunto de dados ligadas às dimensões compartilhadas
+CHAVES_DIMENSOES = {
+    'incidentes': {'categoria': 'Categoria_Risco', 'subcategoria': 'Subcategoria', 'local': 'Local'},
+    'riscos': {'categoria': 'Categoria_Risco', 'subcategoria': 'Subcategoria'},
+    'metricas': {'categoria': 'Categoria_Risco'},
+    'componentes': {'local': 'Localizacao'}
+}
+
+# Status de plano de ação que indicam um risco ainda em aberto
+STATUS_PLANO_ABERTO = ['Não Iniciado', 'Em Andamento', 'Atrasado']
+
+# Função para construir o índice de junção entre os conjuntos de dados
+def construir_indice_juncao(df_incidentes, df_riscos, df_metricas, df_componentes):
+    conjuntos = {
+        'incidentes': df_incidentes,
+        'riscos': df_riscos,
+        'metricas': df_metricas,
+        'componentes': df_componentes
+    }
+
+    # Tabelas de dimensão: valores distintos de todos os conjuntos que usam a dimensão
+    dimensoes = {}
+    for nome, df in conjuntos.items():
+        for dimensao, coluna in CHAVES_DIMENSOES[nome].items():
+            dimensoes.setdefault(dimensao, set()).update(df[coluna].dropna().unique())
+    dimensoes = {dimensao: np.array(sorted(valores), dtype=object) for dimensao, valores in dimensoes.items()}
+
+    # Chaves estrangeiras: código inteiro de cada linha em cada dimensão (-1 para ausente)
+    chaves = {}
+    for nome, df in conjuntos.items():
+        chaves[nome] = {
+            dimensao: pd.Categorical(df[coluna], categories=dimensoes[dimensao]).codes
+            for dimensao, coluna in CHAVES_DIMENSOES[nome].items()
+        }
+
+    # Categoria de cada subcategoria, para agregar subcategorias por categoria
+    subcategoria_categoria = np.full(len(dimensoes['subcategoria']), -1, dtype=np.int32)
+    for nome in ['riscos', 'incidentes']:
+        codigos = chaves[nome]
+        validos = codigos['subcategoria'] >= 0
+        subcategoria_categoria[codigos['subcategoria'][validos]] = codigos['categoria'][validos]
+
+    return {
+        'dimensoes': dimensoes,
+        'chaves': chaves,
+        'subcategoria_categoria': subcategoria_categoria
+    }
+
+# Função para carregar o índice de junção (somente leitura, compartilhado entre sessões)
+@st.cache_resource
+def carregar_indice_juncao():
+    df_incidentes, df_riscos, df_metricas, df_componentes = carregar_dados()
+
+    if df_incidentes is None:
+        return None
+
+    return construir_indice_juncao(df_incidentes, df_riscos, df_metricas, df_componentes)
+
+# Função para executar a simulação Monte Carlo de perdas anuais
+@st.cache_data(show_spinner="Simulando cenários anuais de perdas...")
+def executar_simulacao_perdas(n_cenarios, semente, modo, processos):
+    df_incidentes, df_riscos, _, _ = carregar_dados()
+    
+    parametros = preparar_parametros(df_riscos, df_incidentes, modo)
+    resultado = simular_perdas(parametros, n_cenarios, semente, processos=processos)
+    
+    # Guardar apenas os resumos: o array de perdas não precisa ser copiado a cada execução
+    return {
+        'metricas': calcular_metricas_risco(resultado['perdas']),
+        'curva': calcular_curva_excedencia(resultado['perdas']),
+        'perda_esperada_categoria': resultado['perda_esperada_categoria'],
+        'perda_historica_anual': df_incidentes['Valor_Perda'].sum() / parametros['anos_observados'],
+        'subcategorias_sem_registro': list(parametros['subcategorias_sem_registro']),
+        'duracao': resultado['duracao'],
+        'cenarios_por_segundo': resultado['cenarios_por_segundo']
+    }
+
+# Função para carregar o motor de cenários de controles (compartilhado entre sessões)
+@st.cache_resource
+def carregar_cenarios_controles():
+    df_incidentes, df_riscos, _, _ = carregar_dados()
+    
+    if df_incidentes is None:
+        return None
+    
+    return preparar_cenarios_controles(
+        df_riscos,
+        calcular_coeficientes_perda(df_riscos, df_incidentes),
+        calcular_perdas_sem_registro(df_riscos, df_incidentes)
+    )
+
+# Função para carregar o detector de anomalias de um agrupamento (compartilhado entre sessões)
+@st.cache_resource
+def carregar_detector_anomalias(colunas_chave):
+    return {
+        'detector': criar_detector(colunas_chave, limiar=LIMIAR_MINIMO_ANOMALIAS),
+        'trava': threading.Lock()
+    }
+
+# Função para criar o estado de leitura incremental do registro de incidentes (compartilhado entre sessões)
+@st.cache_resource
+def carregar_estado_fluxo_incidentes():
+    return {
+        'caminho': os.path.join("dados", "registro_incidentes.csv"),
+        'cabecalho': None,
+        'posicao': 0,
+        'df': None,
+        'trava': threading.Lock()
+    }
+
+# Função para ler do registro apenas as linhas completas anexadas desde a última leitura
+def ler_linhas_novas_incidentes(estado):
+    with open(estado['caminho'], 'rb') as arquivo:
+        tamanho = os.fstat(arquivo.fileno()).st_size
+        cabecalho = arquivo.readline()
+        
+        # Arquivo truncado ou com outro cabeçalho: foi reescrito, recomeçar do início
+        reiniciado = estado['cabecalho'] is not None and (
+            tamanho < estado['posicao'] or cabecalho != estado['cabecalho']
+        )
+        if estado['cabecalho'] is None or reiniciado:
+            estado.update(cabecalho=cabecalho, posicao=arquivo.tell(), df=None)
+        
+        arquivo.seek(estado['posicao'])
+        trecho = arquivo.read(tamanho - estado['posicao'])
+    
+    # Uma última linha ainda incompleta fica para a próxima leitura
+    fim = trecho.rfind(b"\n") + 1
+    novos = pd.read_csv(io.BytesIO(estado['cabecalho'] + trecho[:fim]))
+    novos['Data_Hora'] = pd.to_datetime(novos['Data_Hora'])
+    estado['posicao'] += fim
+    
+    return novos, reiniciado
+
+# Função para carregar o registro de incidentes que alimenta o detector
+#
+# O arquivo só cresce por anexação: o estado guarda a posição já lida e só o trecho novo é
+# convertido. O DataFrame acumulado é devolvido por referência, sem cópia a cada execução.
+def carregar_fluxo_incidentes():
+    estado = carregar_estado_fluxo_incidentes()
+    
+    try:
+        with estado['trava']:
+            if estado['df'] is not None and os.path.getsize(estado['caminho']) == estado['posicao']:
+                return estado['df']
+            
+            novos, reiniciado = ler_linhas_novas_incidentes(estado)
+            
+            # Os detectores contam linhas já processadas: um arquivo reescrito exige detectores novos
+            if reiniciado:
+                carregar_detector_anomalias.clear()
+            
+            if estado['df'] is None:
+                estado['df'] = novos
+            elif not novos.empty:
+                estado['df'] = pd.concat([estado['df'], novos], ignore_index=True)
+            
+            return estado['df']
+    
+    except Exception as e:
+        st.error(f"Erro ao carregar o registro de incidentes: {e}")
+        return None
+
+# Função para converter um subconjunto filtrado em máscara booleana sobre o conjunto completo
+def mascara_filtro(df_base, df_filtrado):
+    mascara = np.zeros(len(df_base), dtype=bool)
+    mascara[df_base.index.get_indexer(df_filtrado.index)] = True
+    return mascara
+
+# Função para agregar um conjunto por dimensão (contagem ou soma de pesos)
+def agregar_por_dimensao(indice, conjunto, dimensao, pesos=None, mascara=None):
+    codigos = indice['chaves'][conjunto][dimensao]
+    tamanho = len(indice['dimensoes'][dimensao])
+
+    validos = codigos >= 0
+    if mascara is not None:
+        validos &= mascara
+
+    if pesos is not None:
+        pesos = np.asarray(pesos, dtype=np.float64)[validos]
+
+    return np.bincount(codigos[validos], weights=pesos, minlength=tamanho)
+
+# Função para calcular a média de uma coluna por dimensão
+def media_por_dimensao(indice, conjunto, dimensao, valores, mascara=None):
+    somas = agregar_por_dimensao(indice, conjunto, dimensao, pesos=valores, mascara=mascara)
+    contagens = agregar_por_dimensao(indice, conjunto, dimensao, mascara=mascara)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(contagens > 0, somas / contagens, np.nan)
+
+# Função para levar valores da dimensão para as linhas de um conjunto (gather pela chave estrangeira)
+def propagar_para_conjunto(indice, conjunto, dimensao, valores_dimensao, valor_ausente=np.nan):
+    codigos = indice['chaves'][conjunto][dimensao]
+    valores_dimensao = np.asarray(valores_dimensao)
+
+    resultado = valores_dimensao[np.where(codigos >= 0, codigos, 0)]
+    if valores_dimensao.dtype == bool:
+        return resultado & (codigos >= 0)
+
+    return np.where(codigos >= 0, resultado, valor_ausente)
+
+# Função para consultar incidentes em locais cujos componentes têm baixa precisão
+def consultar_incidentes_por_precisao_local(indice, df_incidentes, df_componentes, limite_precisao, mascara_incidentes=None):
+    precisao_local = media_por_dimensao(indice, 'componentes', 'local', df_componentes['Taxa_Precisao'])
+    componentes_local = agregar_por_dimensao(indice, 'componentes', 'local')
+    incidentes_local = agregar_por_dimensao(indice, 'incidentes', 'local', mascara=mascara_incidentes)
+    perdas_local = agregar_por_dimensao(
+        indice, 'incidentes', 'local', pesos=df_incidentes['Valor_Perda'], mascara=mascara_incidentes
+    )
+
+    return pd.DataFrame({
+        'Local': indice['dimensoes']['local'],
+        'Componentes': componentes_local.astype(int),
+        'Taxa_Precisao_Media': precisao_local,
+        'Numero_Incidentes': incidentes_local.astype(int),
+        'Valor_Perda': perdas_local,
+        'Baixa_Precisao': precisao_local < limite_precisao
+    })
+
+# Função para consultar incidentes por risco em aberto em cada subcategoria
+def consultar_incidentes_por_risco_aberto(indice, df_incidentes, df_riscos, mascara_incidentes=None, categorias_selecionadas=None):
+    riscos_abertos = df_riscos['Status_Plano'].isin(STATUS_PLANO_ABERTO).to_numpy()
+
+    # Aplicar o filtro de categorias aos riscos pelos códigos da dimensão categoria
+    if categorias_selecionadas:
+        selecionadas = np.isin(indice['dimensoes']['categoria'], categorias_selecionadas)
+        codigos_riscos = indice['chaves']['riscos']['categoria']
+        riscos_abertos = riscos_abertos & (codigos_riscos >= 0) & selecionadas[np.maximum(codigos_riscos, 0)]
+
+    abertos = agregar_por_dimensao(indice, 'riscos', 'subcategoria', mascara=riscos_abertos)
+    incidentes = agregar_por_dimensao(indice, 'incidentes', 'subcategoria', mascara=mascara_incidentes)
+    perdas = agregar_por_dimensao(
+        indice, 'incidentes', 'subcategoria', pesos=df_incidentes['Valor_Perda'], mascara=mascara_incidentes
+    )
+
+    categorias = indice['dimensoes']['categoria']
+    codigos_categoria = indice['subcategoria_categoria']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        incidentes_por_risco = np.where(abertos > 0, incidentes / abertos, np.nan)
+
+    return pd.DataFrame({
+        'Subcategoria': indice['dimensoes']['subcategoria'],
+        'Categoria_Risco': np.where(codigos_categoria >= 0, categorias[np.maximum(codigos_categoria, 0)], None),
+        'Riscos_Abertos': abertos.astype(int),
+        'Numero_Incidentes': incidentes.astype(int),
+        'Valor_Perda': perdas,
+        'Incidentes_por_Risco_Aberto': incidentes_por_risco
+    })
+
+# Função para contar riscos por nível em uma única passagem sobre os códigos
+def contar_por_nivel(niveis):
+    codigos = niveis.cat.codes.to_numpy()
+    return np.bincount(codigos[codigos >= 0], minlength=len(NIVEIS_RISCO))
+
+# Função para contar riscos em cada célula da matriz 5x5 em uma única passagem
+def contar_matriz_risco(probabilidades, impactos):
+    celulas = (np.asarray(probabilidades, dtype=np.int64) - 1) * 5 + (np.asarray(impactos, dtype=np.int64) - 1)  # Ajustar para índice 0-24
+    return np.bincount(celulas, minlength=25).reshape(5, 5).astype(float)
+
+# Função para classificar pontuações (probabilidade x impacto) em códigos de nível de risco
+def classificar_nivel_risco(pontuacoes):
+    return np.searchsorted(LIMITES_NIVEL_RISCO, pontuacoes, side='left').astype(np.int8)
+
 # Função para criar mapa de calor de matriz de risco
-def criar_matriz_risco(df_riscos):
+def criar_matriz_risco(df_riscos, titulo="Matriz de Risco"):
     # Criar matriz de contagem
-    matriz = np.zeros((5, 5))
-    
-    for _, row in df_riscos.iterrows():
-        prob = int(row['Probabilidade']) - 1  # Ajustar para índice 0-4
-        imp = int(row['Impacto']) - 1  # Ajustar para índice 0-4
-        matriz[prob, imp] += 1
+    matriz = contar_matriz_risco(df_riscos['Probabilidade'], df_riscos['Impacto'])
     
+    return criar_figura_matriz_risco(matriz, titulo)
+
+# Função para criar a figura do mapa de calor a partir de uma matriz de contagem
+def criar_figura_matriz_risco(matriz, titulo="Matriz de Risco"):
     # Criar figura com plotly
     fig = go.Figure(data=go.Heatmap(
         z=matriz,
@@ -76,7 +455,7 @@ def criar_matriz_risco(df_riscos):
     fig.add_shape(type="line", x0=-0.5, y0=3.5, x1=4.5, y1=3.5, line=dict(color="white", width=2))
     
     fig.update_layout(
-        title="Matriz de Risco",
+        title=titulo,
         xaxis_title="Impacto",
         yaxis_title="Probabilidade",
         height=500,
@@ -84,6 +463,124 @@ def criar_matriz_risco(df_riscos):
     
     return fig
 
+# Função para preparar o motor de cenários de eficácia dos controles
+def preparar_cenarios_controles(df_riscos, coeficientes_perda, perdas_sem_registro=None):
+    # Perdas de subcategorias sem risco registrado: parcela fixa da categoria, sem efeito dos controles
+    if perdas_sem_registro is None:
+        perdas_sem_registro = pd.Series(dtype=np.float64)
+    
+    categorias = np.array(sorted(set(df_riscos['Categoria_Risco']) | set(perdas_sem_registro.index)), dtype=object)
+    codigos = pd.Categorical(df_riscos['Categoria_Risco'], categories=categorias).codes
+    
+    # Ordenar o registro por categoria: cada categoria vira uma fatia contígua dos arrays
+    ordem = np.argsort(codigos, kind='stable')
+    limites = np.searchsorted(codigos[ordem], np.arange(len(categorias) + 1))
+    
+    def coluna(nome, tipo=np.int16):
+        return df_riscos[nome].to_numpy(dtype=tipo)[ordem]
+    
+    return {
+        'categorias': categorias,
+        'limites': limites,
+        'probabilidade': coluna('Probabilidade'),
+        'impacto': coluna('Impacto'),
+        'eficacia': coluna('Eficacia_Controles', np.float64),
+        'probabilidade_residual': coluna('Probabilidade_Residual'),
+        'impacto_residual': coluna('Impacto_Residual'),
+        'coeficiente_perda': np.asarray(coeficientes_perda, dtype=np.float64)[ordem],
+        'perda_sem_registro': perdas_sem_registro.reindex(categorias, fill_value=0.0).to_numpy(dtype=np.float64),
+        'cache_categorias': OrderedDict(),
+        'cache_cenarios': OrderedDict(),
+        'trava': threading.Lock()
+    }
+
+# Função para consultar um cache LRU do motor (compartilhado entre sessões, protegido pela trava)
+def consultar_cache_motor(motor, nome, chave):
+    with motor['trava']:
+        cache = motor[nome]
+        resultado = cache.get(chave)
+        if resultado is not None:
+            cache.move_to_end(chave)
+        return resultado
+
+# Função para guardar um resultado em um cache LRU do motor, descartando os menos usados
+def guardar_cache_motor(motor, nome, chave, resultado, limite):
+    with motor['trava']:
+        cache = motor[nome]
+        cache[chave] = resultado
+        cache.move_to_end(chave)
+        while len(cache) > limite:
+            cache.popitem(last=False)
+
+# Função para estimar a redução de probabilidade e impacto dada a eficácia dos controles
+def reduzir_por_eficacia(valores, eficacia, peso):
+    return np.maximum(1, np.round(valores * (1 - peso * eficacia / 100)))
+
+# Função para recalcular o risco residual de uma categoria com a eficácia ajustada
+def calcular_residual_categoria(motor, indice_categoria, variacao):
+    chave = (indice_categoria, variacao)
+    resultado = consultar_cache_motor(motor, 'cache_categorias', chave)
+    if resultado is not None:
+        return resultado
+    
+    fatia = slice(motor['limites'][indice_categoria], motor['limites'][indice_categoria + 1])
+    probabilidade = motor['probabilidade'][fatia]
+    impacto = motor['impacto'][fatia]
+    eficacia = motor['eficacia'][fatia]
+    probabilidade_residual = motor['probabilidade_residual'][fatia]
+    impacto_residual = motor['impacto_residual'][fatia]
+    
+    # Aplicar ao residual observado apenas a diferença prevista pela nova eficácia
+    nova_eficacia = np.clip(eficacia + variacao, 0, 100)
+    nova_probabilidade = np.clip(
+        probabilidade_residual
+        + reduzir_por_eficacia(probabilidade, nova_eficacia, 1.0)
+        - reduzir_por_eficacia(probabilidade, eficacia, 1.0),
+        1, probabilidade
+    )
+    novo_impacto = np.clip(
+        impacto_residual
+        + reduzir_por_eficacia(impacto, nova_eficacia, 0.5)
+        - reduzir_por_eficacia(impacto, eficacia, 0.5),
+        1, impacto
+    )
+    
+    niveis = classificar_nivel_risco(nova_probabilidade * novo_impacto)
+    
+    resultado = {
+        'matriz': contar_matriz_risco(nova_probabilidade, novo_impacto),
+        'niveis': np.bincount(niveis, minlength=len(NIVEIS_RISCO)),
+        'perda_esperada': float(motor['perda_sem_registro'][indice_categoria] + np.sum(
+            motor['coeficiente_perda'][fatia] * nova_probabilidade * novo_impacto / impacto_residual
+        ))
+    }
+    
+    guardar_cache_motor(motor, 'cache_categorias', chave, resultado, MAXIMO_CACHE_CATEGORIAS)
+    return resultado
+
+# Função para avaliar um cenário de variações de eficácia por categoria
+def avaliar_cenario_controles(motor, variacoes):
+    chave = tuple(variacoes)
+    resultado = consultar_cache_motor(motor, 'cache_cenarios', chave)
+    if resultado is not None:
+        return resultado
+    
+    # Só as categorias com variação ainda não calculada são recomputadas
+    partes = [
+        calcular_residual_categoria(motor, indice, variacao)
+        for indice, variacao in enumerate(chave)
+    ]
+    
+    resultado = {
+        'matriz': np.sum([parte['matriz'] for parte in partes], axis=0),
+        'niveis': np.sum([parte['niveis'] for parte in partes], axis=0),
+        'perda_esperada': sum(parte['perda_esperada'] for parte in partes),
+        'perda_esperada_categoria': [parte['perda_esperada'] for parte in partes]
+    }
+    
+    guardar_cache_motor(motor, 'cache_cenarios', chave, resultado, MAXIMO_CACHE_CENARIOS)
+    return resultado
+
 # Função para criar gráfico de tendência de incidentes
 def criar_grafico_tendencia_incidentes(df_incidentes):
     # Agrupar por mês e categoria
@@ -213,8 +710,701 @@ def criar_grafico_roi(df_metricas):
     
     return fig
 
+# Função para criar gráfico de distribuição (rosca) por uma coluna
+def criar_grafico_distribuicao(df, coluna, titulo):
+    # Agrupar pela coluna
+    df_distribuicao = df.groupby(coluna).size().reset_index(name='Contagem')
+    
+    # Criar gráfico
+    fig = px.pie(
+        df_distribuicao,
+        values='Contagem',
+        names=coluna,
+        title=titulo,
+        hole=0.4
+    )
+    
+    return fig
+
+# Função para criar gráfico de tempo de detecção vs. eficácia da resposta
+def criar_grafico_tempo_deteccao_eficacia(df_incidentes):
+    fig = px.scatter(
+        df_incidentes,
+        x='Tempo_Deteccao',
+        y='Eficacia_Resposta',
+        color='Categoria_Risco',
+        size='Valor_Perda',
+        hover_name='ID_Incidente',
+        hover_data=['Subcategoria', 'Local', 'Status'],
+        title='Tempo de Detecção vs. Eficácia da Resposta',
+        labels={
+            'Tempo_Deteccao': 'Tempo de Detecção (horas)',
+            'Eficacia_Resposta': 'Eficácia da Resposta (%)',
+            'Categoria_Risco': 'Categoria de Risco'
+        }
+    )
+    
+    fig.update_layout(height=500)
+    
+    return fig
+
+# Função para criar gráfico de eficácia média dos controles por categoria
+def criar_grafico_eficacia_controles(df_riscos):
+    df_eficacia = df_riscos.groupby('Categoria_Risco')['Eficacia_Controles'].mean().reset_index()
+    
+    fig = px.bar(
+        df_eficacia,
+        x='Categoria_Risco',
+        y='Eficacia_Controles',
+        color='Categoria_Risco',
+        title='Eficácia Média dos Controles por Categoria',
+        labels={'Categoria_Risco': 'Categoria de Risco', 'Eficacia_Controles': 'Eficácia Média (%)'}
+    )
+    
+    return fig
+
+# Função para criar gráfico de comparação entre risco inerente e residual
+def criar_grafico_comparacao_risco(df_riscos):
+    # Contar riscos por nível antes e depois dos controles
+    df_comparacao = pd.DataFrame({
+        'Nível': NIVEIS_RISCO,
+        'Risco Inerente': contar_por_nivel(df_riscos['Nivel_Risco']),
+        'Risco Residual': contar_por_nivel(df_riscos['Nivel_Risco_Residual'])
+    })
+    
+    df_comparacao_melted = pd.melt(
+        df_comparacao,
+        id_vars=['Nível'],
+        value_vars=['Risco Inerente', 'Risco Residual'],
+        var_name='Tipo de Risco',
+        value_name='Quantidade'
+    )
+    
+    fig = px.bar(
+        df_comparacao_melted,
+        x='Nível',
+        y='Quantidade',
+        color='Tipo de Risco',
+        barmode='group',
+        title='Comparação entre Risco Inerente e Residual',
+        category_orders={"Nível": NIVEIS_RISCO}
+    )
+    
+    return fig
+
+# Função para criar gráfico de falsos positivos vs. falsos negativos por componente
+def criar_grafico_falsos_positivos(df_componentes):
+    fig = px.scatter(
+        df_componentes,
+        x='Falsos_Positivos',
+        y='Falsos_Negativos',
+        color='Tipo_Componente',
+        size='Incidentes_Detectados',
+        hover_name='ID_Componente',
+        hover_data=['Localizacao', 'Status_Operacional', 'Taxa_Precisao'],
+        title='Falsos Positivos vs. Falsos Negativos por Componente',
+        labels={
+            'Falsos_Positivos': 'Falsos Positivos',
+            'Falsos_Negativos': 'Falsos Negativos',
+            'Tipo_Componente': 'Tipo de Componente'
+        }
+    )
+    
+    fig.update_layout(height=500)
+    
+    return fig
+
+# Função para criar gráfico de evolução de perdas por categoria
+def criar_grafico_perdas_tempo(df_metricas):
+    df_perdas_tempo = df_metricas.pivot_table(
+        index='Mes_Ano',
+        columns='Categoria_Risco',
+        values='Valor_Total_Perdas',
+        aggfunc='sum'
+    ).reset_index()
+    
+    fig = px.line(
+        df_perdas_tempo.melt(id_vars=['Mes_Ano'], var_name='Categoria_Risco', value_name='Valor'),
+        x='Mes_Ano',
+        y='Valor',
+        color='Categoria_Risco',
+        markers=True,
+        title='Evolução de Perdas por Categoria',
+        labels={'Mes_Ano': 'Mês/Ano', 'Valor': 'Valor Total de Perdas (R$)'}
+    )
+    
+    return fig
+
+# Função para criar gráfico de razão custo-benefício por categoria
+def criar_grafico_custo_beneficio(df_metricas):
+    df_custo_beneficio = df_metricas.groupby('Categoria_Risco').agg({
+        'Valor_Total_Perdas': 'sum',
+        'Custo_Mitigacao': 'sum',
+        'ROI_Seguranca': 'mean'
+    }).reset_index()
+    
+    df_custo_beneficio['Razao_Custo_Beneficio'] = df_custo_beneficio['Valor_Total_Perdas'] / df_custo_beneficio['Custo_Mitigacao']
+    
+    fig = px.bar(
+        df_custo_beneficio,
+        x='Categoria_Risco',
+        y='Razao_Custo_Beneficio',
+        color='Categoria_Risco',
+        title='Razão Custo-Benefício por Categoria (Perdas Evitadas / Custo de Mitigação)',
+        labels={'Categoria_Risco': 'Categoria de Risco', 'Razao_Custo_Beneficio': 'Razão Custo-Benefício'}
+    )
+    
+    return fig
+
+# Função para calcular a série mensal de perdas usada na projeção
+def calcular_tendencia_perdas(df_metricas):
+    df_tendencia = df_metricas.groupby('Mes_Ano')['Valor_Total_Perdas'].sum().reset_index()
+    df_tendencia['Mes_Ano'] = pd.to_datetime(df_tendencia['Mes_Ano'] + '-01')
+    return df_tendencia.sort_values('Mes_Ano')
+
+# Função para criar gráfico de tendência de perdas e projeção futura
+def criar_grafico_projecao(df_tendencia):
+    fig = go.Figure()
+    
+    # Dados históricos
+    fig.add_trace(go.Scatter(
+        x=df_tendencia['Mes_Ano'],
+        y=df_tendencia['Valor_Total_Perdas'],
+        mode='lines+markers',
+        name='Dados Históricos',
+        line=dict(color='blue')
+    ))
+    
+    # Linha de tendência (regressão linear simples)
+    if len(df_tendencia) >= 3:
+        x = np.arange(len(df_tendencia))
+        y = df_tendencia['Valor_Total_Perdas'].values
+        
+        z = np.polyfit(x, y, 1)
+        p = np.poly1d(z)
+        
+        # Projetar 6 meses à frente
+        x_proj = np.arange(len(df_tendencia) + 6)
+        y_proj = p(x_proj)
+        
+        # Criar datas para projeção
+        ultima_data = df_tendencia['Mes_Ano'].iloc[-1]
+        datas_proj = [ultima_data + pd.DateOffset(months=i) for i in range(-len(df_tendencia)+1, 7)]
+        
+        fig.add_trace(go.Scatter(
+            x=datas_proj,
+            y=y_proj,
+            mode='lines',
+            name='Tendência e Projeção',
+            line=dict(color='red', dash='dash')
+        ))
+    
+    fig.update_layout(
+        title='Tendência de Perdas e Projeção Futura',
+        xaxis_title='Mês/Ano',
+        yaxis_title='Valor Total de Perdas (R$)',
+        height=500
+    )
+    
+    return fig
+
+# Função para criar gráfico de precisão média dos componentes vs. incidentes por local
+def criar_grafico_precisao_local(df_precisao_local, limite_precisao):
+    fig = px.scatter(
+        df_precisao_local.dropna(subset=['Taxa_Precisao_Media']),
+        x='Taxa_Precisao_Media',
+        y='Numero_Incidentes',
+        size='Valor_Perda',
+        color='Baixa_Precisao',
+        hover_name='Local',
+        title='Precisão Média dos Componentes vs. Incidentes por Local',
+        labels={
+            'Taxa_Precisao_Media': 'Taxa Média de Precisão (%)',
+            'Numero_Incidentes': 'Número de Incidentes',
+            'Baixa_Precisao': 'Abaixo do Limite'
+        }
+    )
+    
+    fig.add_vline(x=limite_precisao, line_dash='dash', line_color='red')
+    
+    return fig
+
+# Função para criar gráfico de incidentes por risco em aberto
+def criar_grafico_risco_aberto(df_risco_aberto):
+    fig = px.bar(
+        df_risco_aberto.sort_values('Incidentes_por_Risco_Aberto', ascending=False),
+        x='Subcategoria',
+        y='Incidentes_por_Risco_Aberto',
+        color='Categoria_Risco',
+        hover_data=['Riscos_Abertos', 'Numero_Incidentes'],
+        title='Incidentes por Risco em Aberto',
+        labels={
+            'Incidentes_por_Risco_Aberto': 'Incidentes por Risco Aberto',
+            'Categoria_Risco': 'Categoria de Risco'
+        }
+    )
+    
+    fig.update_layout(height=500)
+    
+    return fig
+
+# Função para criar a curva de excedência de perdas anuais
+def criar_grafico_excedencia(resultado):
+    metricas = resultado['metricas']
+    
+    fig = px.line(
+        resultado['curva'],
+        x='Valor_Perda',
+        y='Probabilidade_Excedencia',
+        title='Curva de Excedência de Perdas Anuais',
+        labels={
+            'Valor_Perda': 'Perda Anual (R$)',
+            'Probabilidade_Excedencia': 'Probabilidade de Excedência'
+        }
+    )
+    
+    for nome, cor in [('VaR_95%', 'orange'), ('VaR_99%', 'red')]:
+        fig.add_vline(
+            x=metricas[nome],
+            line_dash='dash',
+            line_color=cor,
+            annotation_text=nome.replace('_', ' ')
+        )
+    
+    fig.update_layout(height=500)
+    
+    return fig
+
+# Função para criar gráfico de perda esperada anual por categoria
+def criar_grafico_perda_esperada_categoria(resultado):
+    df_perda_categoria = resultado['perda_esperada_categoria'].rename_axis('Categoria_Risco').reset_index(name='Perda_Esperada')
+    
+    fig = px.bar(
+        df_perda_categoria,
+        x='Categoria_Risco',
+        y='Perda_Esperada',
+        color='Categoria_Risco',
+        title='Perda Esperada Anual por Categoria',
+        labels={'Categoria_Risco': 'Categoria de Risco', 'Perda_Esperada': 'Perda Esperada (R$)'}
+    )
+    
+    return fig
+
+# Função para criar gráfico de riscos residuais por nível: atual vs. cenário simulado
+def criar_grafico_niveis_cenario(base, cenario):
+    df_niveis_cenario = pd.DataFrame({
+        'Nível': NIVEIS_RISCO * 2,
+        'Cenário': ['Atual'] * len(NIVEIS_RISCO) + ['Simulado'] * len(NIVEIS_RISCO),
+        'Quantidade': np.concatenate([base['niveis'], cenario['niveis']])
+    })
+    
+    fig = px.bar(
+        df_niveis_cenario,
+        x='Nível',
+        y='Quantidade',
+        color='Cenário',
+        barmode='group',
+        title='Riscos Residuais por Nível: Atual vs. Simulado',
+        category_orders={"Nível": NIVEIS_RISCO}
+    )
+    
+    fig.update_layout(height=500)
+    
+    return fig
+
+# Função para decodificar um array já serializado em formato binário pelo plotly
+def decodificar_array_binario(spec):
+    array = np.frombuffer(base64.b64decode(spec['bdata']), dtype=np.dtype(spec['dtype']).newbyteorder('<'))
+
+    if 'shape' in spec:
+        array = array.reshape([int(dim) for dim in str(spec['shape']).split(',')])
+
+    return array
+
+# Função para arredondar valores a um número de algarismos significativos, sem descer abaixo dos centavos
+def arredondar_significativos(array, precisao):
+    array = np.asarray(array, dtype=float)
+    magnitudes = np.zeros_like(array)
+    validos = np.isfinite(array) & (array != 0)
+    magnitudes[validos] = np.floor(np.log10(np.abs(array[validos])))
+    escala = 10.0 ** np.maximum(CASAS_DECIMAIS_MINIMAS, precisao - 1 - magnitudes)
+
+    arredondado = array.copy()
+    arredondado[validos] = np.round(array[validos] * escala[validos]) / escala[validos]
+    return arredondado
+
+# Função para reduzir a precisão e o tipo de um array numérico do gráfico
+def compactar_array(valores, precisao=PRECISAO_GRAFICOS):
+    if isinstance(valores, dict):
+        if 'bdata' not in valores:
+            return valores
+        array = decodificar_array_binario(valores)
+    else:
+        try:
+            array = np.asarray(valores)
+        except ValueError:
+            return valores
+
+    if array.dtype.kind not in 'iuf' or array.size == 0:
+        return valores
+
+    # Arredondar para a precisão de exibição, relativa à magnitude de cada valor
+    if array.dtype.kind == 'f' and precisao is not None:
+        array = arredondar_significativos(array, precisao)
+
+    # Escolher o menor tipo binário que representa exatamente os valores arredondados
+    finitos = np.isfinite(array) if array.dtype.kind == 'f' else None
+    tipo = 'f8'
+
+    if finitos is None or (finitos.all() and np.array_equal(array, np.round(array))):
+        minimo, maximo = array.min(), array.max()
+        for candidato in TIPOS_INTEIROS_BINARIOS:
+            info = np.iinfo(np.dtype(candidato))
+            if info.min <= minimo and maximo <= info.max:
+                tipo = candidato
+                break
+    elif np.array_equal(array.astype(np.float32).astype(np.float64), array, equal_nan=True):
+        tipo = 'f4'
+
+    lista = None
+    if array.size < LIMITE_ARRAY_BINARIO:
+        lista = array.astype(np.float64 if tipo.startswith('f') else np.int64).tolist()
+
+    array = array.astype(np.dtype(tipo).newbyteorder('<'))
+
+    spec = {'dtype': tipo, 'bdata': base64.b64encode(array.tobytes()).decode('ascii')}
+    if array.ndim > 1:
+        spec['shape'] = ','.join(str(dim) for dim in array.shape)
+
+    # Arrays pequenos seguem como lista apenas quando ela é menor que o buffer codificado
+    if lista is not None and len(json.dumps(lista)) < len(json.dumps(spec)):
+        return lista
+
+    return spec
+
+# Função para remover colunas de customdata que não aparecem no hovertemplate
+def remover_colunas_hover(trace, precisao=PRECISAO_GRAFICOS):
+    template = trace.get('hovertemplate')
+    if not isinstance(template, str):
+        return
+
+    customdata = trace['customdata']
+    if isinstance(customdata, dict) and 'bdata' in customdata:
+        customdata = decodificar_array_binario(customdata)
+    customdata = np.asarray(customdata, dtype=object)
+    if customdata.ndim != 2:
+        return
+
+    usadas = sorted({int(indice) for indice in re.findall(r'customdata\[(\d+)\]', template)})
+    if not usadas:
+        del trace['customdata']
+        return
+
+    # Reindexar as referências do template para as colunas mantidas
+    novos_indices = {antigo: novo for novo, antigo in enumerate(usadas)}
+    trace['hovertemplate'] = re.sub(
+        r'customdata\[(\d+)\]',
+        lambda m: f"customdata[{novos_indices[int(m.group(1))]}]",
+        template
+    )
+
+    colunas = []
+    for indice in usadas:
+        coluna = customdata[:, indice]
+        try:
+            coluna = coluna.astype(float)
+            if precisao is not None:
+                coluna = arredondar_significativos(coluna, precisao)
+            if np.isfinite(coluna).all() and np.array_equal(coluna, np.round(coluna)):
+                coluna = coluna.astype(np.int64)
+        except (TypeError, ValueError):
+            pass
+        colunas.append(coluna.tolist())
+
+    trace['customdata'] = [list(linha) for linha in zip(*colunas)]
+
+# Função para compactar recursivamente os arrays de um trace
+def compactar_trace(trace, precisao=PRECISAO_GRAFICOS):
+    for chave, valor in list(trace.items()):
+        if chave == 'customdata':
+            continue
+        if isinstance(valor, dict) and 'bdata' not in valor:
+            compactar_trace(valor, precisao)
+        elif isinstance(valor, (dict, list, tuple, np.ndarray)):
+            trace[chave] = compactar_array(valor, precisao)
+
+# Função para remover do template os padrões de tipos de trace e subplots que a figura não usa
+def podar_template(fig_dict):
+    template = fig_dict['layout'].get('template')
+    if not isinstance(template, dict):
+        return
+
+    tipos = {trace.get('type', 'scatter') for trace in fig_dict['data']}
+
+    if isinstance(template.get('data'), dict):
+        template['data'] = {tipo: padroes for tipo, padroes in template['data'].items() if tipo in tipos}
+
+    if isinstance(template.get('layout'), dict):
+        for subplot, tipos_subplot in SUBPLOTS_TEMPLATE.items():
+            if not tipos & tipos_subplot:
+                template['layout'].pop(subplot, None)
+
+# Função para otimizar a figura antes de enviá-la ao navegador
+def otimizar_figura(fig, precisao=PRECISAO_GRAFICOS):
+    # Figuras sem traces (filtros sem resultado) seguem como estão e aparecem como gráfico vazio
+    if not fig.data:
+        return fig
+
+    fig_dict = fig.to_plotly_json()
+
+    for trace in fig_dict['data']:
+        if 'customdata' in trace:
+            remover_colunas_hover(trace, precisao)
+        compactar_trace(trace, precisao)
+
+    podar_template(fig_dict)
+
+    # O dicionário vem de uma figura já validada: reconstruí-la sem revalidar custa poucos milissegundos,
+    # e o Streamlit não repete a validação de um dicionário (que falha quando não há traces)
+    return go.Figure(fig_dict, _validate=False)
+
+# Escopos das estatísticas de payload: o script completo e o fragmento, que também é reexecutado sozinho
+ESCOPO_PAYLOAD_PAGINA = 'payload_graficos'
+ESCOPO_PAYLOAD_FRAGMENTO = 'payload_fragmento'
+
+# Função para reiniciar as estatísticas de payload de um escopo a cada execução
+def iniciar_estatisticas_payload(escopo=ESCOPO_PAYLOAD_PAGINA):
+    st.session_state[escopo] = {
+        'bytes_enviados': 0,
+        'graficos': 0
+    }
+
+# Função para exibir um gráfico com payload compacto
+def exibir_grafico(fig, chave, precisao=PRECISAO_GRAFICOS, otimizada=False, escopo=ESCOPO_PAYLOAD_PAGINA):
+    # Figuras padrão já chegam compactadas do cache
+    figura = fig if otimizada else otimizar_figura(fig, precisao)
+
+    if escopo not in st.session_state:
+        iniciar_estatisticas_payload(escopo)
+
+    # Contabilizar o payload efetivamente enviado (serializado uma única vez)
+    estatisticas = st.session_state[escopo]
+    estatisticas['graficos'] += 1
+    estatisticas['bytes_enviados'] += len(pio.to_json(figura, validate=False).encode('utf-8'))
+
+    st.plotly_chart(figura, use_container_width=True, key=f"grafico_{chave}")
+
+# Função para exibir o resumo do payload enviado pelos escopos informados
+def exibir_estatisticas_payload(container, escopos=(ESCOPO_PAYLOAD_PAGINA, ESCOPO_PAYLOAD_FRAGMENTO), descricao="nesta execução"):
+    estatisticas = [st.session_state[escopo] for escopo in escopos if escopo in st.session_state]
+    graficos = sum(item['graficos'] for item in estatisticas)
+    if graficos == 0:
+        return
+
+    bytes_enviados = sum(item['bytes_enviados'] for item in estatisticas)
+    container.caption(
+        f"Payload dos gráficos: {bytes_enviados / 1024:.1f} KB enviados "
+        f"em {graficos} gráfico(s) {descricao}"
+    )
+
+# Função para criar as figuras de uma página com os filtros padrão
+def criar_figuras_padrao(pagina):
+    df_incidentes, df_riscos, df_metricas, df_componentes = carregar_dados()
+    
+    if pagina == "Visão Geral":
+        return {
+            'tendencia': criar_grafico_tendencia_incidentes(df_incidentes),
+            'perdas': criar_grafico_perdas_categoria(df_incidentes),
+            'eficacia_deteccao_resposta': criar_grafico_eficacia(df_metricas),
+            'local': criar_grafico_incidentes_local(df_incidentes)
+        }
+    
+    if pagina == "Análise de Incidentes":
+        return {
+            'subcategoria': criar_grafico_distribuicao(df_incidentes, 'Subcategoria', 'Distribuição por Subcategoria'),
+            'metodo_deteccao': criar_grafico_distribuicao(df_incidentes, 'Metodo_Deteccao', 'Distribuição por Método de Detecção'),
+            'tempo_deteccao_eficacia': criar_grafico_tempo_deteccao_eficacia(df_incidentes)
+        }
+    
+    if pagina == "Matriz de Risco":
+        return {
+            'matriz': criar_matriz_risco(df_riscos),
+            'eficacia_controles': criar_grafico_eficacia_controles(df_riscos),
+            'comparacao': criar_grafico_comparacao_risco(df_riscos)
+        }
+    
+    if pagina == "Desempenho do Sistema":
+        return {
+            'tipo_componente': criar_grafico_distribuicao(df_componentes, 'Tipo_Componente', 'Distribuição por Tipo de Componente'),
+            'status_operacional': criar_grafico_distribuicao(df_componentes, 'Status_Operacional', 'Distribuição por Status Operacional'),
+            'precisao': criar_grafico_precisao_componentes(df_componentes),
+            'falsos_positivos_negativos': criar_grafico_falsos_positivos(df_componentes)
+        }
+    
+    if pagina == "Análise Financeira":
+        return {
+            'perdas_tempo': criar_grafico_perdas_tempo(df_metricas),
+            'roi': criar_grafico_roi(df_metricas),
+            'custo_beneficio': criar_grafico_custo_beneficio(df_metricas),
+            'projecao': criar_grafico_projecao(calcular_tendencia_perdas(df_metricas))
+        }
+    
+    if pagina == "Análise Cruzada":
+        indice = carregar_indice_juncao()
+        mascara_incidentes = np.ones(len(df_incidentes), dtype=bool)
+        
+        df_precisao_local = consultar_incidentes_por_precisao_local(
+            indice, df_incidentes, df_componentes, LIMITE_PRECISAO_PADRAO, mascara_incidentes
+        )
+        df_risco_aberto = consultar_incidentes_por_risco_aberto(indice, df_incidentes, df_riscos, mascara_incidentes)
+        
+        return {
+            'precisao_local': criar_grafico_precisao_local(df_precisao_local, LIMITE_PRECISAO_PADRAO),
+            'risco_aberto': criar_grafico_risco_aberto(df_risco_aberto[df_risco_aberto['Riscos_Abertos'] > 0])
+        }
+    
+    if pagina == "Simulação de Perdas":
+        resultado = executar_simulacao_perdas(CENARIOS_PADRAO, SEMENTE_PADRAO, 'residual', 1)
+        
+        return {
+            'excedencia': criar_grafico_excedencia(resultado),
+            'perda_esperada_categoria': criar_grafico_perda_esperada_categoria(resultado)
+        }
+    
+    if pagina == "Cenários de Controles":
+        motor = carregar_cenarios_controles()
+        base = avaliar_cenario_controles(motor, [0] * len(motor['categorias']))
+        
+        return {
+            'matriz_cenario': criar_figura_matriz_risco(base['matriz'], "Matriz de Risco Residual no Cenário"),
+            'niveis_cenario': criar_grafico_niveis_cenario(base, base)
+        }
+    
+    return {}
+
+# Função para carregar as figuras padrão de uma página já compactadas (compartilhadas entre sessões, somente leitura)
+@st.cache_resource(show_spinner=False)
+def carregar_figuras_padrao(pagina):
+    return {
+        chave: otimizar_figura(fig, None if chave in GRAFICOS_SEM_ARREDONDAMENTO else PRECISAO_GRAFICOS)
+        for chave, fig in criar_figuras_padrao(pagina).items()
+    }
+
+# Função para aquecer os caches do processo: dados, índices, simulação, detector e figuras padrão
+def aquecer_dashboard():
+    inicio = time.perf_counter()
+    dados = carregar_dados()
+    
+    if dados[0] is None:
+        return
+    
+    registrar_tempo_inicializacao("Carga dos dados", time.perf_counter() - inicio)
+    
+    inicio = time.perf_counter()
+    carregar_indice_juncao()
+    carregar_cenarios_controles()
+    registrar_tempo_inicializacao("Índice de junção e cenários", time.perf_counter() - inicio)
+    
+    inicio = time.perf_counter()
+    executar_simulacao_perdas(CENARIOS_PADRAO, SEMENTE_PADRAO, 'residual', 1)
+    registrar_tempo_inicializacao("Simulação padrão", time.perf_counter() - inicio)
+    
+    inicio = time.perf_counter()
+    df_fluxo = carregar_fluxo_incidentes()
+    recurso = carregar_detector_anomalias(AGRUPAMENTOS_ANOMALIAS[0])
+    with recurso['trava']:
+        alimentar_detector(recurso['detector'], df_fluxo if df_fluxo is not None else dados[0])
+    registrar_tempo_inicializacao("Detector de anomalias", time.perf_counter() - inicio)
+    
+    # Figuras padrão de cada página; serializá-las aquece o plotly (validadores e templates carregados sob demanda)
+    inicio = time.perf_counter()
+    for pagina in PAGINAS:
+        for fig in carregar_figuras_padrao(pagina).values():
+            pio.to_json(fig, validate=False)
+    registrar_tempo_inicializacao("Figuras padrão", time.perf_counter() - inicio)
+
+# Função para iniciar o aquecimento em segundo plano uma única vez por processo
+@st.cache_resource(show_spinner=False)
+def iniciar_aquecimento():
+    thread = threading.Thread(target=aquecer_dashboard, name="aquecimento_dashboard", daemon=True)
+    thread.start()
+    return thread
+
+# Função para exibir os tempos de inicialização na barra lateral
+def exibir_tempos_inicializacao(aquecimento):
+    with st.sidebar.expander("Inicialização"):
+        if aquecimento is None:
+            st.caption("Aquecimento desativado")
+        elif aquecimento.is_alive():
+            st.caption("Aquecimento em andamento...")
+        else:
+            st.caption("Caches aquecidos")
+        
+        for etapa, duracao in tempos_inicializacao().items():
+            st.caption(f"{etapa}: {duracao * 1000:.0f} ms")
+
+# Função para exibir a seção de precisão por local em um fragmento: o controle deslizante
+# reexecuta apenas esta seção, sem reenviar os demais gráficos da página
+@st.fragment
+def exibir_secao_precisao_local(indice, df_incidentes, df_componentes, mascara_incidentes, filtros_padrao):
+    # O fragmento contabiliza o próprio payload, reiniciado a cada execução dele
+    iniciar_estatisticas_payload(ESCOPO_PAYLOAD_FRAGMENTO)
+    
+    # Incidentes em locais com componentes de baixa precisão
+    st.subheader("Incidentes em Locais com Componentes de Baixa Precisão")
+    
+    limite_precisao = st.slider(
+        "Limite de Taxa de Precisão (%)",
+        min_value=0,
+        max_value=100,
+        value=LIMITE_PRECISAO_PADRAO
+    )
+    
+    df_precisao_local = consultar_incidentes_por_precisao_local(
+        indice, df_incidentes, df_componentes, limite_precisao, mascara_incidentes
+    )
+    
+    # Marcar os incidentes cujo local tem precisão média abaixo do limite
+    mascara_baixa_precisao = propagar_para_conjunto(
+        indice, 'incidentes', 'local', df_precisao_local['Baixa_Precisao'].to_numpy()
+    ) & mascara_incidentes
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        locais_baixa_precisao = int(df_precisao_local['Baixa_Precisao'].sum())
+        st.metric("Locais Abaixo do Limite", f"{locais_baixa_precisao}")
+    
+    with col2:
+        st.metric("Incidentes nesses Locais", f"{int(mascara_baixa_precisao.sum())}")
+    
+    with col3:
+        valor_baixa_precisao = df_incidentes['Valor_Perda'].to_numpy()[mascara_baixa_precisao].sum()
+        st.metric("Perdas nesses Locais", f"R$ {valor_baixa_precisao:,.2f}")
+    
+    padrao = filtros_padrao and limite_precisao == LIMITE_PRECISAO_PADRAO
+    if padrao:
+        fig_precisao_local = carregar_figuras_padrao("Análise Cruzada")['precisao_local']
+    else:
+        fig_precisao_local = criar_grafico_precisao_local(df_precisao_local, limite_precisao)
+    
+    exibir_grafico(fig_precisao_local, 'precisao_local', otimizada=padrao, escopo=ESCOPO_PAYLOAD_FRAGMENTO)
+    exibir_estatisticas_payload(st, (ESCOPO_PAYLOAD_FRAGMENTO,), "nesta seção")
+    
+    colunas_exibir = ['ID_Incidente', 'Data_Hora', 'Categoria_Risco', 'Subcategoria',
+                     'Local', 'Valor_Perda', 'Status']
+    
+    st.dataframe(
+        df_incidentes.loc[mascara_baixa_precisao, colunas_exibir].sort_values('Data_Hora', ascending=False),
+        use_container_width=True,
+        hide_index=True
+    )
+
 # Função principal
 def main():
+    # Iniciar o aquecimento dos caches na primeira execução do processo
+    aquecimento = iniciar_aquecimento() if AQUECIMENTO_ATIVO else None
+    
     # Carregar dados
     df_incidentes, df_riscos, df_metricas, df_componentes = carregar_dados()
     
@@ -229,7 +1419,7 @@ def main():
     # Opções de navegação
     pagina = st.sidebar.radio(
         "Navegação",
-        ["Visão Geral", "Análise de Incidentes", "Matriz de Risco", "Desempenho do Sistema", "Análise Financeira"]
+        PAGINAS
     )
     
     # Filtros globais
@@ -264,9 +1454,22 @@ def main():
     if categorias_selecionadas:
         df_incidentes_filtrado = df_incidentes_filtrado[df_incidentes_filtrado['Categoria_Risco'].isin(categorias_selecionadas)]
     
+    # Sem filtros globais efetivos as páginas usam as figuras pré-calculadas
+    filtros_padrao = len(df_incidentes_filtrado) == len(df_incidentes) and (
+        not categorias_selecionadas or set(categorias_selecionadas) == set(categorias)
+    )
+    
     # Informações do filtro
     st.sidebar.info(f"Exibindo {len(df_incidentes_filtrado)} incidentes de um total de {len(df_incidentes)}")
     
+    # Espaço reservado para o resumo de payload dos gráficos
+    painel_payload = st.sidebar.empty()
+    iniciar_estatisticas_payload(ESCOPO_PAYLOAD_PAGINA)
+    iniciar_estatisticas_payload(ESCOPO_PAYLOAD_FRAGMENTO)
+    
+    # Tempos de importação e aquecimento
+    exibir_tempos_inicializacao(aquecimento)
+    
     # Créditos
     st.sidebar.markdown("---")
     st.sidebar.caption("Desenvolvido para análise de risco em ambientes logísticos")
@@ -296,27 +1499,38 @@ def main():
         
         st.markdown("---")
         
+        figuras = carregar_figuras_padrao(pagina)
+        
         # Gráficos na segunda linha
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_tendencia = criar_grafico_tendencia_incidentes(df_incidentes_filtrado)
-            st.plotly_chart(fig_tendencia, use_container_width=True)
+            if filtros_padrao:
+                fig_tendencia = figuras['tendencia']
+            else:
+                fig_tendencia = criar_grafico_tendencia_incidentes(df_incidentes_filtrado)
+            exibir_grafico(fig_tendencia, 'tendencia', otimizada=filtros_padrao)
         
         with col2:
-            fig_perdas = criar_grafico_perdas_categoria(df_incidentes_filtrado)
-            st.plotly_chart(fig_perdas, use_container_width=True)
+            if filtros_padrao:
+                fig_perdas = figuras['perdas']
+            else:
+                fig_perdas = criar_grafico_perdas_categoria(df_incidentes_filtrado)
+            exibir_grafico(fig_perdas, 'perdas', otimizada=filtros_padrao)
         
         # Gráficos na terceira linha
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_eficacia = criar_grafico_eficacia(df_metricas)
-            st.plotly_chart(fig_eficacia, use_container_width=True)
+            # Métricas de desempenho não dependem dos filtros globais
+            exibir_grafico(figuras['eficacia_deteccao_resposta'], 'eficacia_deteccao_resposta', otimizada=True)
         
         with col2:
-            fig_local = criar_grafico_incidentes_local(df_incidentes_filtrado)
-            st.plotly_chart(fig_local, use_container_width=True)
+            if filtros_padrao:
+                fig_local = figuras['local']
+            else:
+                fig_local = criar_grafico_incidentes_local(df_incidentes_filtrado)
+            exibir_grafico(fig_local, 'local', otimizada=filtros_padrao)
     
     elif pagina == "Análise de Incidentes":
         st.title("Análise Detalhada de Incidentes")
@@ -357,32 +1571,27 @@ def main():
         if status_selecionado != "Todos":
             df_filtrado = df_filtrado[df_filtrado['Status'] == status_selecionado]
         
+        padrao = filtros_padrao and len(df_filtrado) == len(df_incidentes)
+        figuras = carregar_figuras_padrao(pagina) if padrao else None
+        
         # Gráficos e análises
         col1, col2 = st.columns(2)
         
         with col1:
             # Distribuição por subcategoria
-            df_sub = df_filtrado.groupby('Subcategoria').size().reset_index(name='Contagem')
-            fig_sub = px.pie(
-                df_sub,
-                values='Contagem',
-                names='Subcategoria',
-                title='Distribuição por Subcategoria',
-                hole=0.4
-            )
-            st.plotly_chart(fig_sub, use_container_width=True)
+            if padrao:
+                fig_sub = figuras['subcategoria']
+            else:
+                fig_sub = criar_grafico_distribuicao(df_filtrado, 'Subcategoria', 'Distribuição por Subcategoria')
+            exibir_grafico(fig_sub, 'subcategoria', otimizada=padrao)
         
         with col2:
             # Distribuição por método de detecção
-            df_metodo = df_filtrado.groupby('Metodo_Deteccao').size().reset_index(name='Contagem')
-            fig_metodo = px.pie(
-                df_metodo,
-                values='Contagem',
-                names='Metodo_Deteccao',
-                title='Distribuição por Método de Detecção',
-                hole=0.4
-            )
-            st.plotly_chart(fig_metodo, use_container_width=True)
+            if padrao:
+                fig_metodo = figuras['metodo_deteccao']
+            else:
+                fig_metodo = criar_grafico_distribuicao(df_filtrado, 'Metodo_Deteccao', 'Distribuição por Método de Detecção')
+            exibir_grafico(fig_metodo, 'metodo_deteccao', otimizada=padrao)
         
         # Tabela de incidentes
         st.subheader("Lista de Incidentes")
@@ -399,24 +1608,12 @@ def main():
         # Análise de tempo de detecção vs eficácia
         st.subheader("Relação entre Tempo de Detecção e Eficácia da Resposta")
         
-        fig_scatter = px.scatter(
-            df_filtrado,
-            x='Tempo_Deteccao',
-            y='Eficacia_Resposta',
-            color='Categoria_Risco',
-            size='Valor_Perda',
-            hover_name='ID_Incidente',
-            hover_data=['Subcategoria', 'Local', 'Status'],
-            title='Tempo de Detecção vs. Eficácia da Resposta',
-            labels={
-                'Tempo_Deteccao': 'Tempo de Detecção (horas)',
-                'Eficacia_Resposta': 'Eficácia da Resposta (%)',
-                'Categoria_Risco': 'Categoria de Risco'
-            }
-        )
+        if padrao:
+            fig_scatter = figuras['tempo_deteccao_eficacia']
+        else:
+            fig_scatter = criar_grafico_tempo_deteccao_eficacia(df_filtrado)
         
-        fig_scatter.update_layout(height=500)
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        exibir_grafico(fig_scatter, 'tempo_deteccao_eficacia', otimizada=padrao)
     
     elif pagina == "Matriz de Risco":
         st.title("Matriz de Risco")
@@ -432,10 +1629,9 @@ def main():
             )
         
         with col2:
-            niveis_risco = ['Baixo', 'Médio', 'Alto', 'Extremo']
             nivel_selecionado = st.selectbox(
                 "Nível de Risco",
-                options=["Todos"] + niveis_risco
+                options=["Todos"] + NIVEIS_RISCO
             )
         
         # Aplicar filtros
@@ -447,9 +1643,15 @@ def main():
         if nivel_selecionado != "Todos":
             df_riscos_filtrado = df_riscos_filtrado[df_riscos_filtrado['Nivel_Risco'] == nivel_selecionado]
         
+        padrao = categoria_selecionada == "Todas" and nivel_selecionado == "Todos"
+        figuras = carregar_figuras_padrao(pagina) if padrao else None
+        
         # Matriz de risco
-        fig_matriz = criar_matriz_risco(df_riscos_filtrado)
-        st.plotly_chart(fig_matriz, use_container_width=True)
+        if padrao:
+            fig_matriz = figuras['matriz']
+        else:
+            fig_matriz = criar_matriz_risco(df_riscos_filtrado)
+        exibir_grafico(fig_matriz, 'matriz', otimizada=padrao)
         
         # Tabela de riscos
         st.subheader("Lista de Riscos Identificados")
@@ -459,8 +1661,7 @@ def main():
                          'Nivel_Risco_Residual', 'Status_Plano']
         
         st.dataframe(
-            df_riscos_filtrado[colunas_exibir].sort_values(['Nivel_Risco', 'Probabilidade', 'Impacto'], 
-                                                         ascending=[False, False, False]),
+            df_riscos_filtrado.sort_values('Chave_Ordenacao', ascending=False, kind='stable')[colunas_exibir],
             use_container_width=True,
             hide_index=True
         )
@@ -468,54 +1669,22 @@ def main():
         # Análise de eficácia dos controles
         st.subheader("Eficácia dos Controles por Categoria de Risco")
         
-        df_eficacia = df_riscos_filtrado.groupby('Categoria_Risco')['Eficacia_Controles'].mean().reset_index()
-        
-        fig_eficacia = px.bar(
-            df_eficacia,
-            x='Categoria_Risco',
-            y='Eficacia_Controles',
-            color='Categoria_Risco',
-            title='Eficácia Média dos Controles por Categoria',
-            labels={'Categoria_Risco': 'Categoria de Risco', 'Eficacia_Controles': 'Eficácia Média (%)'}
-        )
+        if padrao:
+            fig_eficacia = figuras['eficacia_controles']
+        else:
+            fig_eficacia = criar_grafico_eficacia_controles(df_riscos_filtrado)
         
-        st.plotly_chart(fig_eficacia, use_container_width=True)
+        exibir_grafico(fig_eficacia, 'eficacia_controles', otimizada=padrao)
         
         # Comparação entre risco inerente e residual
         st.subheader("Comparação entre Risco Inerente e Residual")
         
-        # Contar riscos por nível antes e depois dos controles
-        df_comparacao = pd.DataFrame({
-            'Nível': niveis_risco,
-            'Risco Inerente': [
-                len(df_riscos_filtrado[df_riscos_filtrado['Nivel_Risco'] == nivel])
-                for nivel in niveis_risco
-            ],
-            'Risco Residual': [
-                len(df_riscos_filtrado[df_riscos_filtrado['Nivel_Risco_Residual'] == nivel])
-                for nivel in niveis_risco
-            ]
-        })
-        
-        df_comparacao_melted = pd.melt(
-            df_comparacao, 
-            id_vars=['Nível'], 
-            value_vars=['Risco Inerente', 'Risco Residual'],
-            var_name='Tipo de Risco', 
-            value_name='Quantidade'
-        )
-        
-        fig_comparacao = px.bar(
-            df_comparacao_melted,
-            x='Nível',
-            y='Quantidade',
-            color='Tipo de Risco',
-            barmode='group',
-            title='Comparação entre Risco Inerente e Residual',
-            category_orders={"Nível": ["Baixo", "Médio", "Alto", "Extremo"]}
-        )
+        if padrao:
+            fig_comparacao = figuras['comparacao']
+        else:
+            fig_comparacao = criar_grafico_comparacao_risco(df_riscos_filtrado)
         
-        st.plotly_chart(fig_comparacao, use_container_width=True)
+        exibir_grafico(fig_comparacao, 'comparacao', otimizada=padrao)
     
     elif pagina == "Desempenho do Sistema":
         st.title("Desempenho do Sistema de Prevenção")
@@ -546,6 +1715,9 @@ def main():
         if local_selecionado != "Todos":
             df_componentes_filtrado = df_componentes_filtrado[df_componentes_filtrado['Localizacao'] == local_selecionado]
         
+        padrao = tipo_selecionado == "Todos" and local_selecionado == "Todos"
+        figuras = carregar_figuras_padrao(pagina) if padrao else None
+        
         # KPIs
         col1, col2, col3, col4 = st.columns(4)
         
@@ -571,31 +1743,26 @@ def main():
         
         with col1:
             # Distribuição por tipo de componente
-            df_tipo = df_componentes_filtrado.groupby('Tipo_Componente').size().reset_index(name='Contagem')
-            fig_tipo = px.pie(
-                df_tipo,
-                values='Contagem',
-                names='Tipo_Componente',
-                title='Distribuição por Tipo de Componente',
-                hole=0.4
-            )
-            st.plotly_chart(fig_tipo, use_container_width=True)
+            if padrao:
+                fig_tipo = figuras['tipo_componente']
+            else:
+                fig_tipo = criar_grafico_distribuicao(df_componentes_filtrado, 'Tipo_Componente', 'Distribuição por Tipo de Componente')
+            exibir_grafico(fig_tipo, 'tipo_componente', otimizada=padrao)
         
         with col2:
             # Distribuição por status operacional
-            df_status = df_componentes_filtrado.groupby('Status_Operacional').size().reset_index(name='Contagem')
-            fig_status = px.pie(
-                df_status,
-                values='Contagem',
-                names='Status_Operacional',
-                title='Distribuição por Status Operacional',
-                hole=0.4
-            )
-            st.plotly_chart(fig_status, use_container_width=True)
+            if padrao:
+                fig_status = figuras['status_operacional']
+            else:
+                fig_status = criar_grafico_distribuicao(df_componentes_filtrado, 'Status_Operacional', 'Distribuição por Status Operacional')
+            exibir_grafico(fig_status, 'status_operacional', otimizada=padrao)
         
         # Gráfico de precisão
-        fig_precisao = criar_grafico_precisao_componentes(df_componentes_filtrado)
-        st.plotly_chart(fig_precisao, use_container_width=True)
+        if padrao:
+            fig_precisao = figuras['precisao']
+        else:
+            fig_precisao = criar_grafico_precisao_componentes(df_componentes_filtrado)
+        exibir_grafico(fig_precisao, 'precisao', otimizada=padrao)
         
         # Tabela de componentes
         st.subheader("Lista de Componentes")
@@ -613,24 +1780,12 @@ def main():
         # Análise de falsos positivos vs falsos negativos
         st.subheader("Relação entre Falsos Positivos e Falsos Negativos")
         
-        fig_falsos = px.scatter(
-            df_componentes_filtrado,
-            x='Falsos_Positivos',
-            y='Falsos_Negativos',
-            color='Tipo_Componente',
-            size='Incidentes_Detectados',
-            hover_name='ID_Componente',
-            hover_data=['Localizacao', 'Status_Operacional', 'Taxa_Precisao'],
-            title='Falsos Positivos vs. Falsos Negativos por Componente',
-            labels={
-                'Falsos_Positivos': 'Falsos Positivos',
-                'Falsos_Negativos': 'Falsos Negativos',
-                'Tipo_Componente': 'Tipo de Componente'
-            }
-        )
+        if padrao:
+            fig_falsos = figuras['falsos_positivos_negativos']
+        else:
+            fig_falsos = criar_grafico_falsos_positivos(df_componentes_filtrado)
         
-        fig_falsos.update_layout(height=500)
-        st.plotly_chart(fig_falsos, use_container_width=True)
+        exibir_grafico(fig_falsos, 'falsos_positivos_negativos', otimizada=padrao)
     
     elif pagina == "Análise Financeira":
         st.title("Análise Financeira e ROI")
@@ -649,6 +1804,9 @@ def main():
         else:
             df_metricas_filtrado = df_metricas
         
+        padrao = len(df_metricas_filtrado) == len(df_metricas)
+        figuras = carregar_figuras_padrao(pagina) if padrao else None
+        
         # KPIs financeiros
         col1, col2, col3 = st.columns(3)
         
@@ -669,51 +1827,30 @@ def main():
         
         with col1:
             # Evolução de perdas por categoria
-            df_perdas_tempo = df_metricas_filtrado.pivot_table(
-                index='Mes_Ano',
-                columns='Categoria_Risco',
-                values='Valor_Total_Perdas',
-                aggfunc='sum'
-            ).reset_index()
-            
-            fig_perdas_tempo = px.line(
-                df_perdas_tempo.melt(id_vars=['Mes_Ano'], var_name='Categoria_Risco', value_name='Valor'),
-                x='Mes_Ano',
-                y='Valor',
-                color='Categoria_Risco',
-                markers=True,
-                title='Evolução de Perdas por Categoria',
-                labels={'Mes_Ano': 'Mês/Ano', 'Valor': 'Valor Total de Perdas (R$)'}
-            )
+            if padrao:
+                fig_perdas_tempo = figuras['perdas_tempo']
+            else:
+                fig_perdas_tempo = criar_grafico_perdas_tempo(df_metricas_filtrado)
             
-            st.plotly_chart(fig_perdas_tempo, use_container_width=True)
+            exibir_grafico(fig_perdas_tempo, 'perdas_tempo', otimizada=padrao)
         
         with col2:
             # Gráfico de ROI
-            fig_roi = criar_grafico_roi(df_metricas_filtrado)
-            st.plotly_chart(fig_roi, use_container_width=True)
+            if padrao:
+                fig_roi = figuras['roi']
+            else:
+                fig_roi = criar_grafico_roi(df_metricas_filtrado)
+            exibir_grafico(fig_roi, 'roi', otimizada=padrao)
         
         # Análise de custo-benefício
         st.subheader("Análise de Custo-Benefício por Categoria")
         
-        df_custo_beneficio = df_metricas_filtrado.groupby('Categoria_Risco').agg({
-            'Valor_Total_Perdas': 'sum',
-            'Custo_Mitigacao': 'sum',
-            'ROI_Seguranca': 'mean'
-        }).reset_index()
-        
-        df_custo_beneficio['Razao_Custo_Beneficio'] = df_custo_beneficio['Valor_Total_Perdas'] / df_custo_beneficio['Custo_Mitigacao']
-        
-        fig_cb = px.bar(
-            df_custo_beneficio,
-            x='Categoria_Risco',
-            y='Razao_Custo_Beneficio',
-            color='Categoria_Risco',
-            title='Razão Custo-Benefício por Categoria (Perdas Evitadas / Custo de Mitigação)',
-            labels={'Categoria_Risco': 'Categoria de Risco', 'Razao_Custo_Beneficio': 'Razão Custo-Benefício'}
-        )
+        if padrao:
+            fig_cb = figuras['custo_beneficio']
+        else:
+            fig_cb = criar_grafico_custo_beneficio(df_metricas_filtrado)
         
-        st.plotly_chart(fig_cb, use_container_width=True)
+        exibir_grafico(fig_cb, 'custo_beneficio', otimizada=padrao)
         
         # Tabela de métricas financeiras
         st.subheader("Métricas Financeiras por Mês")
@@ -740,9 +1877,7 @@ def main():
         st.subheader("Projeção de Economia Anual")
         
         # Calcular tendência de redução de perdas
-        df_tendencia = df_metricas_filtrado.groupby('Mes_Ano')['Valor_Total_Perdas'].sum().reset_index()
-        df_tendencia['Mes_Ano'] = pd.to_datetime(df_tendencia['Mes_Ano'] + '-01')
-        df_tendencia = df_tendencia.sort_values('Mes_Ano')
+        df_tendencia = calcular_tendencia_perdas(df_metricas_filtrado)
         
         # Calcular média dos primeiros 3 meses vs últimos 3 meses
         if len(df_tendencia) >= 6:
@@ -760,49 +1895,301 @@ def main():
                 st.metric("Economia Anual Projetada", f"R$ {economia_anual:,.2f}")
         
         # Gráfico de projeção
-        fig_projecao = go.Figure()
-        
-        # Dados históricos
-        fig_projecao.add_trace(go.Scatter(
-            x=df_tendencia['Mes_Ano'],
-            y=df_tendencia['Valor_Total_Perdas'],
-            mode='lines+markers',
-            name='Dados Históricos',
-            line=dict(color='blue')
-        ))
+        if padrao:
+            fig_projecao = figuras['projecao']
+        else:
+            fig_projecao = criar_grafico_projecao(df_tendencia)
         
-        # Linha de tendência (regressão linear simples)
-        if len(df_tendencia) >= 3:
-            x = np.arange(len(df_tendencia))
-            y = df_tendencia['Valor_Total_Perdas'].values
-            
-            z = np.polyfit(x, y, 1)
-            p = np.poly1d(z)
-            
-            # Projetar 6 meses à frente
-            x_proj = np.arange(len(df_tendencia) + 6)
-            y_proj = p(x_proj)
-            
-            # Criar datas para projeção
-            ultima_data = df_tendencia['Mes_Ano'].iloc[-1]
-            datas_proj = [ultima_data + pd.DateOffset(months=i) for i in range(-len(df_tendencia)+1, 7)]
+        exibir_grafico(fig_projecao, 'projecao', otimizada=padrao)
+    
+    elif pagina == "Análise Cruzada":
+        st.title("Análise Cruzada de Incidentes, Riscos e Componentes")
+        
+        indice = carregar_indice_juncao()
+        mascara_incidentes = mascara_filtro(df_incidentes, df_incidentes_filtrado)
+        
+        exibir_secao_precisao_local(indice, df_incidentes, df_componentes, mascara_incidentes, filtros_padrao)
+        
+        # Incidentes por risco em aberto
+        st.subheader("Incidentes por Risco em Aberto por Subcategoria")
+        
+        df_risco_aberto = consultar_incidentes_por_risco_aberto(
+            indice, df_incidentes, df_riscos, mascara_incidentes, categorias_selecionadas
+        )
+        df_risco_aberto = df_risco_aberto[df_risco_aberto['Riscos_Abertos'] > 0]
+        
+        if filtros_padrao:
+            fig_risco_aberto = carregar_figuras_padrao(pagina)['risco_aberto']
+        else:
+            fig_risco_aberto = criar_grafico_risco_aberto(df_risco_aberto)
+        
+        exibir_grafico(fig_risco_aberto, 'risco_aberto', otimizada=filtros_padrao)
+        
+        st.dataframe(
+            df_risco_aberto.sort_values('Incidentes_por_Risco_Aberto', ascending=False),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    elif pagina == "Simulação de Perdas":
+        st.title("Simulação Monte Carlo de Perdas Anuais")
+        
+        # Parâmetros da simulação
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            n_cenarios = st.select_slider(
+                "Número de Cenários",
+                options=[100_000, 250_000, 500_000, 1_000_000, 2_000_000, 5_000_000],
+                value=CENARIOS_PADRAO,
+                format_func=lambda valor: f"{valor:,}"
+            )
+        
+        with col2:
+            semente = st.number_input("Semente Aleatória", min_value=0, value=SEMENTE_PADRAO, step=1)
+        
+        with col3:
+            modo = st.radio(
+                "Base de Risco",
+                options=["residual", "inerente"],
+                format_func=lambda valor: "Residual (com controles)" if valor == "residual" else "Inerente (sem controles)"
+            )
+        
+        with col4:
+            processos = st.number_input(
+                "Processos Paralelos",
+                min_value=1,
+                max_value=os.cpu_count() or 1,
+                value=1,
+                step=1
+            )
+        
+        resultado = executar_simulacao_perdas(n_cenarios, int(semente), modo, int(processos))
+        metricas = resultado['metricas']
+        
+        # O número de processos não altera o resultado, apenas o tempo de execução
+        padrao = n_cenarios == CENARIOS_PADRAO and int(semente) == SEMENTE_PADRAO and modo == 'residual'
+        figuras = carregar_figuras_padrao(pagina) if padrao else None
+        
+        # KPIs de risco
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Perda Esperada Anual", f"R$ {metricas['Perda_Esperada']:,.2f}")
+        
+        with col2:
+            st.metric("VaR 95%", f"R$ {metricas['VaR_95%']:,.2f}")
+        
+        with col3:
+            st.metric("VaR 99%", f"R$ {metricas['VaR_99%']:,.2f}")
+        
+        with col4:
+            st.metric("CVaR 99%", f"R$ {metricas['CVaR_99%']:,.2f}")
+        
+        st.caption(
+            f"{n_cenarios:,} cenários em {resultado['duracao']:.2f} s "
+            f"({resultado['cenarios_por_segundo']:,.0f} cenários/s) · "
+            f"Perda histórica anualizada: R$ {resultado['perda_historica_anual']:,.2f}"
+        )
+        
+        if resultado['subcategorias_sem_registro']:
+            st.caption(
+                "Subcategorias com incidentes sem risco registrado (frequência histórica, sem ajuste de controles): "
+                + ", ".join(resultado['subcategorias_sem_registro'])
+            )
+        
+        # Curva de excedência de perdas
+        if padrao:
+            fig_excedencia = figuras['excedencia']
+        else:
+            fig_excedencia = criar_grafico_excedencia(resultado)
+        
+        # A cauda da curva tem probabilidades muito pequenas: enviar os valores sem arredondamento
+        exibir_grafico(fig_excedencia, 'excedencia', precisao=None, otimizada=padrao)
+        
+        # Perda esperada por categoria
+        if padrao:
+            fig_perda_categoria = figuras['perda_esperada_categoria']
+        else:
+            fig_perda_categoria = criar_grafico_perda_esperada_categoria(resultado)
+        
+        exibir_grafico(fig_perda_categoria, 'perda_esperada_categoria', otimizada=padrao)
+        
+        # Tabela de métricas de risco
+        st.subheader("Métricas de Risco")
+        
+        st.dataframe(
+            pd.DataFrame({'Métrica': list(metricas.keys()), 'Valor (R$)': list(metricas.values())}),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    elif pagina == "Cenários de Controles":
+        st.title("Cenários de Eficácia dos Controles")
+        
+        motor = carregar_cenarios_controles()
+        
+        # Variação da eficácia por categoria de risco
+        st.subheader("Variação da Eficácia dos Controles (pontos percentuais)")
+        
+        colunas = st.columns(len(motor['categorias']))
+        variacoes = []
+        
+        for coluna, categoria in zip(colunas, motor['categorias']):
+            with coluna:
+                variacoes.append(st.slider(
+                    categoria,
+                    min_value=-50,
+                    max_value=50,
+                    value=0,
+                    step=5
+                ))
+        
+        inicio = time.perf_counter()
+        cenario = avaliar_cenario_controles(motor, variacoes)
+        latencia = (time.perf_counter() - inicio) * 1000
+        
+        base = avaliar_cenario_controles(motor, [0] * len(motor['categorias']))
+        
+        padrao = not any(variacoes)
+        figuras = carregar_figuras_padrao(pagina) if padrao else None
+        
+        # KPIs do cenário
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric(
+                "Perda Esperada Anual",
+                f"R$ {cenario['perda_esperada']:,.2f}",
+                delta=f"R$ {cenario['perda_esperada'] - base['perda_esperada']:,.2f}",
+                delta_color="inverse"
+            )
+        
+        with col2:
+            altos_cenario = int(cenario['niveis'][2:].sum())
+            altos_base = int(base['niveis'][2:].sum())
+            st.metric(
+                "Riscos Residuais Alto/Extremo",
+                f"{altos_cenario}",
+                delta=altos_cenario - altos_base,
+                delta_color="inverse"
+            )
+        
+        with col3:
+            st.metric("Tempo de Recálculo", f"{latencia:.1f} ms")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if padrao:
+                fig_matriz_cenario = figuras['matriz_cenario']
+            else:
+                fig_matriz_cenario = criar_figura_matriz_risco(cenario['matriz'], "Matriz de Risco Residual no Cenário")
+            exibir_grafico(fig_matriz_cenario, 'matriz_cenario', otimizada=padrao)
+        
+        with col2:
+            if padrao:
+                fig_niveis_cenario = figuras['niveis_cenario']
+            else:
+                fig_niveis_cenario = criar_grafico_niveis_cenario(base, cenario)
             
-            fig_projecao.add_trace(go.Scatter(
-                x=datas_proj,
-                y=y_proj,
-                mode='lines',
-                name='Tendência e Projeção',
-                line=dict(color='red', dash='dash')
-            ))
-        
-        fig_projecao.update_layout(
-            title='Tendência de Perdas e Projeção Futura',
-            xaxis_title='Mês/Ano',
-            yaxis_title='Valor Total de Perdas (R$)',
-            height=500
+            exibir_grafico(fig_niveis_cenario, 'niveis_cenario', otimizada=padrao)
+        
+        # Perda esperada por categoria
+        df_perda_cenario = pd.DataFrame({
+            'Categoria_Risco': motor['categorias'],
+            'Perda_Atual': base['perda_esperada_categoria'],
+            'Perda_Simulada': cenario['perda_esperada_categoria']
+        })
+        df_perda_cenario['Variacao'] = df_perda_cenario['Perda_Simulada'] - df_perda_cenario['Perda_Atual']
+        
+        st.dataframe(df_perda_cenario, use_container_width=True, hide_index=True)
+    
+    elif pagina == "Alertas de Anomalias":
+        st.title("Alertas de Anomalias em Incidentes")
+        
+        # Parâmetros do detector
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            colunas_chave = st.radio(
+                "Agrupamento",
+                options=AGRUPAMENTOS_ANOMALIAS,
+                format_func=lambda colunas: " e ".join(colunas).replace('_', ' ')
+            )
+        
+        with col2:
+            limiar = st.slider(
+                "Limiar (desvios-padrão)",
+                min_value=LIMIAR_MINIMO_ANOMALIAS,
+                max_value=5.0,
+                value=LIMIAR_DESVIOS,
+                step=0.5
+            )
+        
+        # Processar apenas os incidentes que chegaram ao registro desde a última execução
+        df_fluxo = carregar_fluxo_incidentes()
+        if df_fluxo is None:
+            df_fluxo = df_incidentes
+        
+        recurso = carregar_detector_anomalias(colunas_chave)
+        detector = recurso['detector']
+        
+        with recurso['trava']:
+            inicio = time.perf_counter()
+            novos_alertas = alimentar_detector(detector, df_fluxo)
+            duracao = time.perf_counter() - inicio
+            df_alertas = listar_alertas(detector, limiar)
+        
+        # Cada alerta guarda seu desvio: o limiar escolhido é aplicado sem recriar o detector
+        novos_alertas = [alerta for alerta in novos_alertas if alerta['Desvios'] > limiar]
+        
+        if novos_alertas:
+            st.warning(f"{len(novos_alertas)} novo(s) alerta(s) desde a última atualização")
+        
+        # Respeitar o filtro global de categorias quando o agrupamento inclui a categoria
+        if 'Categoria_Risco' in df_alertas.columns and categorias_selecionadas:
+            df_alertas = df_alertas[df_alertas['Categoria_Risco'].isin(categorias_selecionadas)]
+        
+        # KPIs
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Incidentes Processados", f"{detector['processados']}")
+        
+        with col2:
+            st.metric("Total de Alertas", f"{len(df_alertas)}")
+        
+        with col3:
+            st.metric("Alertas de Perda", f"{int((df_alertas['Tipo'] == 'Valor_Perda').sum())}")
+        
+        with col4:
+            st.metric("Alertas de Frequência", f"{int((df_alertas['Tipo'] == 'Frequência').sum())}")
+        
+        st.caption(f"Atualização processada em {duracao * 1000:.1f} ms")
+        
+        # Alertas por grupo
+        coluna_grupo = colunas_chave[0]
+        df_alertas_grupo = df_alertas.groupby([coluna_grupo, 'Tipo']).size().reset_index(name='Contagem')
+        
+        fig_alertas = px.bar(
+            df_alertas_grupo,
+            x=coluna_grupo,
+            y='Contagem',
+            color='Tipo',
+            title='Alertas por ' + coluna_grupo.replace('_', ' '),
+            labels={'Contagem': 'Número de Alertas', 'Tipo': 'Tipo de Alerta'}
         )
         
-        st.plotly_chart(fig_projecao, use_container_width=True)
+        exibir_grafico(fig_alertas, 'alertas')
+        
+        # Lista de alertas
+        st.subheader("Alertas Recentes")
+        
+        st.dataframe(df_alertas, use_container_width=True, hide_index=True)
+    
+    # Resumo do payload da execução completa; reexecuções isoladas do fragmento informam o próprio payload
+    exibir_estatisticas_payload(painel_payload, descricao="na última execução completa")
 
 # Executar a aplicação
 if __name__ == "__main__":
@@ -0,0 +1,250 @@
+# Detecção de anomalias em fluxo de incidentes
+#
+# Cada incidente é processado uma única vez, em O(1), atualizando estatísticas
+# online por chave (por padrão Local x Categoria_Risco):
+# - média e variância exponenciais (EWMA) de Valor_Perda, com linha de base
+#   sazonal por hora do dia (Data_Hora) quando há observações suficientes;
+# - média e variância exponenciais da contagem diária de incidentes.
+# Um alerta é gerado quando a perda ou a contagem do dia se afasta da linha
+# de base além do limiar de desvios-padrão. O histórico nunca é reprocessado.
+# Cada alerta guarda seu desvio, de modo que um limiar mais alto pode ser
+# aplicado na listagem sem recriar o detector.
+
+import argparse
+import math
+import os
+import time
+from collections import deque
+
+import pandas as pd
+
+# Peso da observação mais recente nas médias exponenciais
+ALFA_EWMA = 0.1
+
+# Número de desvios-padrão acima da linha de base para gerar alerta
+LIMIAR_DESVIOS = 3.0
+
+# Observações mínimas antes de uma linha de base ser usada para alertar
+MINIMO_OBSERVACOES = 5
+
+# Menor contagem diária considerada pico (um único incidente nunca é pico)
+MINIMO_EVENTOS_PICO = 2
+
+# Desvio-padrão mínimo da contagem diária, em eventos
+DESVIO_MINIMO_CONTAGEM = 1.0
+
+# Número máximo de alertas mantidos em memória com o limiar padrão
+MAXIMO_ALERTAS = 1000
+
+# Função para criar um acumulador EWMA vazio
+def criar_estatistica():
+    return {'n': 0, 'media': 0.0, 'variancia': 0.0}
+
+# Função para atualizar um acumulador EWMA com uma nova observação
+def atualizar_estatistica(estatistica, valor, alfa):
+    if estatistica['n'] == 0:
+        estatistica['media'] = valor
+        estatistica['variancia'] = 0.0
+    else:
+        diferenca = valor - estatistica['media']
+        incremento = alfa * diferenca
+        estatistica['media'] += incremento
+        estatistica['variancia'] = (1 - alfa) * (estatistica['variancia'] + diferenca * incremento)
+    estatistica['n'] += 1
+
+# Função para aplicar k observações nulas de uma vez (forma fechada da recursão EWMA)
+def aplicar_zeros(estatistica, k, alfa):
+    if k <= 0:
+        return
+    if estatistica['n'] == 0:
+        estatistica['media'] = 0.0
+        estatistica['variancia'] = 0.0
+    else:
+        decaimento = (1 - alfa) ** k
+        media = estatistica['media']
+        estatistica['variancia'] = decaimento * (estatistica['variancia'] + media * media * (1 - decaimento))
+        estatistica['media'] = media * decaimento
+    estatistica['n'] += k
+
+# Função para calcular o desvio em desvios-padrão de um valor em relação a um acumulador
+def calcular_desvio(estatistica, valor):
+    if estatistica['variancia'] <= 0:
+        return 0.0
+    return (valor - estatistica['media']) / math.sqrt(estatistica['variancia'])
+
+# Função para escalar o limite de alertas quando o detector registra a partir de outro limiar
+#
+# Um limiar menor gera mais alertas; o limite cresce pela razão das caudas da normal
+# (cerca de 17x de 3 para 2 desvios) para que os alertas acima do limiar padrão não
+# sejam descartados pelos mais fracos. Caudas mais pesadas têm razão menor.
+def calcular_maximo_alertas(limiar):
+    fator = math.erfc(limiar / math.sqrt(2)) / math.erfc(LIMIAR_DESVIOS / math.sqrt(2))
+    return int(math.ceil(MAXIMO_ALERTAS * max(fator, 1.0)))
+
+# Função para criar o detector de anomalias
+def criar_detector(colunas_chave=('Local', 'Categoria_Risco'), alfa=ALFA_EWMA, limiar=LIMIAR_DESVIOS,
+                   minimo_observacoes=MINIMO_OBSERVACOES, maximo_alertas=None):
+    if maximo_alertas is None:
+        maximo_alertas = calcular_maximo_alertas(limiar)
+
+    return {
+        'colunas_chave': tuple(colunas_chave),
+        'alfa': alfa,
+        'limiar': limiar,
+        'minimo_observacoes': minimo_observacoes,
+        'estados': {},
+        'alertas': deque(maxlen=maximo_alertas),
+        'processados': 0,
+        'total_alertas': 0
+    }
+
+# Função para obter (ou criar) o estado de uma chave
+def obter_estado(detector, chave):
+    estado = detector['estados'].get(chave)
+    if estado is None:
+        estado = {
+            'perda': criar_estatistica(),
+            'perda_hora': [criar_estatistica() for _ in range(24)],
+            'contagem': criar_estatistica(),
+            'dia_atual': None,
+            'contagem_dia': 0,
+            'alerta_dia': None
+        }
+        detector['estados'][chave] = estado
+    return estado
+
+# Função para fechar o dia corrente e aplicar os dias sem incidentes à média de contagens
+def avancar_dia(detector, estado, dia):
+    alfa = detector['alfa']
+
+    atualizar_estatistica(estado['contagem'], estado['contagem_dia'], alfa)
+    aplicar_zeros(estado['contagem'], dia - estado['dia_atual'] - 1, alfa)
+
+    estado['dia_atual'] = dia
+    estado['contagem_dia'] = 0
+    estado['alerta_dia'] = None
+
+# Função para registrar um alerta
+def registrar_alerta(detector, chave, data_hora, tipo, valor, esperado, desvio):
+    alerta = {'Data_Hora': data_hora}
+    alerta.update(zip(detector['colunas_chave'], chave))
+    alerta.update({
+        'Tipo': tipo,
+        'Valor': valor,
+        'Esperado': esperado,
+        'Desvios': desvio
+    })
+
+    detector['alertas'].append(alerta)
+    detector['total_alertas'] += 1
+    return alerta
+
+# Função para processar um incidente e devolver os alertas gerados por ele
+def processar_evento(detector, chave, data_hora, valor_perda, hora, dia):
+    estado = obter_estado(detector, chave)
+    minimo = detector['minimo_observacoes']
+    limiar = detector['limiar']
+    alertas = []
+
+    # Perda: linha de base sazonal da hora do dia, ou da chave quando a hora tem poucas observações
+    linha_base = estado['perda_hora'][hora]
+    if linha_base['n'] < minimo:
+        linha_base = estado['perda']
+
+    if linha_base['n'] >= minimo:
+        desvio = calcular_desvio(linha_base, valor_perda)
+        if desvio > limiar:
+            alertas.append(registrar_alerta(
+                detector, chave, data_hora, 'Valor_Perda', valor_perda, linha_base['media'], desvio
+            ))
+
+    atualizar_estatistica(estado['perda'], valor_perda, detector['alfa'])
+    atualizar_estatistica(estado['perda_hora'][hora], valor_perda, detector['alfa'])
+
+    # Contagem diária: eventos atrasados (dia anterior ao corrente) só atualizam a perda
+    if estado['dia_atual'] is None:
+        estado['dia_atual'] = dia
+    elif dia > estado['dia_atual']:
+        avancar_dia(detector, estado, dia)
+    elif dia < estado['dia_atual']:
+        return alertas
+
+    estado['contagem_dia'] += 1
+
+    contagem = estado['contagem']
+    if contagem['n'] >= minimo and estado['contagem_dia'] >= MINIMO_EVENTOS_PICO:
+        # Desvio-padrão mínimo de Poisson, e nunca abaixo de um evento: em chaves esparsas
+        # a média diária é quase zero e um único evento extra não deve valer dezenas de desvios
+        desvio_padrao = max(math.sqrt(max(contagem['variancia'], contagem['media'])), DESVIO_MINIMO_CONTAGEM)
+        desvio = (estado['contagem_dia'] - contagem['media']) / desvio_padrao
+        if estado['alerta_dia'] is not None:
+            # Um alerta de frequência por dia: os eventos seguintes só atualizam o pico
+            estado['alerta_dia']['Valor'] = estado['contagem_dia']
+            estado['alerta_dia']['Desvios'] = desvio
+        elif desvio > limiar:
+            estado['alerta_dia'] = registrar_alerta(
+                detector, chave, data_hora, 'Frequência', estado['contagem_dia'], contagem['media'], desvio
+            )
+            alertas.append(estado['alerta_dia'])
+
+    return alertas
+
+# Função para alimentar o detector apenas com os incidentes ainda não processados
+def alimentar_detector(detector, df_incidentes):
+    novos = df_incidentes.iloc[detector['processados']:]
+    if novos.empty:
+        return []
+
+    # Converter as colunas para listas Python uma vez; o laço por evento fica só com operações O(1)
+    chaves = zip(*(novos[coluna].tolist() for coluna in detector['colunas_chave']))
+    datas = pd.to_datetime(novos['Data_Hora'])
+    horas = datas.dt.hour.tolist()
+    dias = datas.to_numpy().astype('datetime64[D]').astype('int64').tolist()
+
+    alertas = []
+    for chave, data_hora, valor_perda, hora, dia in zip(
+        chaves, datas.tolist(), novos['Valor_Perda'].astype(float).tolist(), horas, dias
+    ):
+        alertas.extend(processar_evento(detector, chave, data_hora, valor_perda, hora, dia))
+
+    detector['processados'] += len(novos)
+    return alertas
+
+# Função para listar os alertas mais recentes em um DataFrame, opcionalmente acima de um limiar mais alto
+def listar_alertas(detector, limiar=None):
+    colunas = ['Data_Hora'] + list(detector['colunas_chave']) + ['Tipo', 'Valor', 'Esperado', 'Desvios']
+    df_alertas = pd.DataFrame(list(detector['alertas']), columns=colunas)
+
+    if limiar is not None:
+        df_alertas = df_alertas[df_alertas['Desvios'] > limiar]
+
+    return df_alertas.sort_values('Data_Hora', ascending=False)
+
+# Executar o benchmark de desempenho pela linha de comando
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da detecção de anomalias em incidentes")
+    parser.add_argument("--eventos", type=int, default=1_000_000)
+    parser.add_argument("--dados", default="dados")
+    args = parser.parse_args()
+
+    df_incidentes = pd.read_csv(os.path.join(args.dados, "registro_incidentes.csv"))
+    df_incidentes = df_incidentes.sort_values('Data_Hora', kind='stable')
+
+    # Repetir o histórico deslocando as datas para simular um fluxo contínuo de eventos
+    repeticoes = max(1, math.ceil(args.eventos / len(df_incidentes)))
+    datas = pd.to_datetime(df_incidentes['Data_Hora'])
+    periodo = datas.max() - datas.min() + pd.Timedelta(days=1)
+    df_fluxo = pd.concat(
+        [df_incidentes.assign(Data_Hora=datas + periodo * i) for i in range(repeticoes)],
+        ignore_index=True
+    ).iloc[:args.eventos]
+
+    detector = criar_detector()
+    inicio = time.perf_counter()
+    alimentar_detector(detector, df_fluxo)
+    duracao = time.perf_counter() - inicio
+
+    print(f"Eventos: {len(df_fluxo):,}")
+    print(f"Alertas: {detector['total_alertas']:,}")
+    print(f"Duração: {duracao:.2f} s")
+    print(f"Throughput: {len(df_fluxo) / duracao:,.0f} eventos/s")
@@ -0,0 +1,309 @@
+# Motor de simulação Monte Carlo de perdas anuais a partir da matriz de riscos
+#
+# Cada subcategoria de risco é modelada como um processo de Poisson composto:
+# a frequência anual vem do histórico de incidentes, ponderada pelas
+# probabilidades da análise de riscos, e a severidade é reamostrada da
+# distribuição histórica de Valor_Perda da subcategoria (ou da categoria,
+# quando há poucas observações). Subcategorias com incidentes mas sem risco
+# registrado entram com a frequência histórica e multiplicador 1. Os cenários
+# são simulados em blocos de arrays NumPy para manter a memória limitada.
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Número mínimo de perdas históricas para usar a distribuição da própria subcategoria
+MINIMO_AMOSTRAS_SEVERIDADE = 5
+
+# Limite aproximado de eventos (e de células da matriz de contagens) por bloco (controla o uso de memória)
+LIMITE_EVENTOS_BLOCO = 2_000_000
+
+# Níveis de confiança padrão para VaR e CVaR
+NIVEIS_CONFIANCA = (0.95, 0.99)
+
+# Função para calcular o período observado do histórico em anos
+def calcular_anos_observados(df_incidentes):
+    datas = pd.to_datetime(df_incidentes['Data_Hora'])
+    dias = (datas.max() - datas.min()).total_seconds() / 86400 + 1
+    return max(dias / 365.25, 1 / 12)
+
+# Função para agrupar as perdas históricas por subcategoria e por categoria em uma única passagem
+def agrupar_perdas_historicas(df_incidentes):
+    valores = df_incidentes['Valor_Perda'].to_numpy(dtype=np.float64)
+
+    return {
+        'subcategoria': {chave: valores[linhas] for chave, linhas in df_incidentes.groupby('Subcategoria').indices.items()},
+        'categoria': {chave: valores[linhas] for chave, linhas in df_incidentes.groupby('Categoria_Risco').indices.items()},
+        'todas': valores
+    }
+
+# Função para selecionar as perdas históricas usadas como severidade de uma subcategoria
+def selecionar_amostras_severidade(perdas, subcategoria, categoria):
+    vazio = perdas['todas'][:0]
+    valores = perdas['subcategoria'].get(subcategoria, vazio)
+
+    if len(valores) < MINIMO_AMOSTRAS_SEVERIDADE:
+        valores_categoria = perdas['categoria'].get(categoria, vazio)
+        if len(valores_categoria) > 0:
+            valores = valores_categoria
+    if len(valores) == 0:
+        valores = perdas['todas']
+
+    return valores
+
+# Função para calcular a frequência anual histórica de cada subcategoria
+def calcular_frequencias_historicas(df_incidentes, subcategorias, anos):
+    # Meio evento no período quando a subcategoria não tem histórico
+    contagem = df_incidentes.groupby('Subcategoria').size().reindex(subcategorias).fillna(0.5)
+    return contagem.to_numpy(dtype=np.float64) / anos
+
+# Função para listar as subcategorias com incidentes mas sem risco no registro (e suas categorias)
+def listar_subcategorias_sem_registro(df_riscos, df_incidentes):
+    historicas = df_incidentes.groupby('Subcategoria', sort=True)['Categoria_Risco'].first()
+    return historicas[~historicas.index.isin(df_riscos['Subcategoria'].unique())]
+
+# Função para preparar os parâmetros de frequência e severidade por subcategoria
+def preparar_parametros(df_riscos, df_incidentes, modo='residual'):
+    anos = calcular_anos_observados(df_incidentes)
+
+    coluna_prob = 'Probabilidade_Residual' if modo == 'residual' else 'Probabilidade'
+    coluna_imp = 'Impacto_Residual' if modo == 'residual' else 'Impacto'
+
+    riscos = df_riscos[['Categoria_Risco', 'Subcategoria']].copy()
+    riscos['Peso'] = df_riscos[coluna_prob].astype(float)
+    riscos['Peso_Residual'] = df_riscos['Probabilidade_Residual'].astype(float)
+    riscos['Fator_Impacto'] = df_riscos[coluna_imp].astype(float) / df_riscos['Impacto_Residual'].astype(float)
+
+    subcategorias = riscos.groupby('Subcategoria', sort=True).agg(
+        Categoria_Risco=('Categoria_Risco', 'first'),
+        Peso=('Peso', 'sum'),
+        Peso_Residual=('Peso_Residual', 'sum')
+    )
+
+    # Subcategorias sem risco registrado: frequência histórica sem ajuste (pesos iguais)
+    sem_registro = listar_subcategorias_sem_registro(df_riscos, df_incidentes)
+    subcategorias = pd.concat([
+        subcategorias,
+        pd.DataFrame({'Categoria_Risco': sem_registro, 'Peso': 1.0, 'Peso_Residual': 1.0}, index=sem_registro.index)
+    ]).sort_index()
+
+    # O histórico reflete o estado residual; o modo inerente escala pela razão das probabilidades
+    frequencias = calcular_frequencias_historicas(df_incidentes, subcategorias.index, anos)
+    frequencias *= subcategorias['Peso'].to_numpy() / subcategorias['Peso_Residual'].to_numpy()
+
+    # Fator de impacto médio ponderado pela probabilidade de cada risco da subcategoria
+    riscos['Impacto_Ponderado'] = riscos['Peso'] * riscos['Fator_Impacto']
+    multiplicadores = (
+        riscos.groupby('Subcategoria')['Impacto_Ponderado'].sum() / subcategorias['Peso']
+    ).reindex(subcategorias.index).fillna(1.0).to_numpy()
+
+    # Amostras de severidade concatenadas, com início e tamanho de cada subcategoria
+    perdas = agrupar_perdas_historicas(df_incidentes)
+    amostras, inicios, tamanhos = [], [], []
+    posicao = 0
+    for subcategoria, categoria in subcategorias['Categoria_Risco'].items():
+        valores = selecionar_amostras_severidade(perdas, subcategoria, categoria)
+
+        amostras.append(valores)
+        inicios.append(posicao)
+        tamanhos.append(len(valores))
+        posicao += len(valores)
+
+    categorias = np.array(sorted(subcategorias['Categoria_Risco'].unique()), dtype=object)
+
+    return {
+        'subcategorias': subcategorias.index.to_numpy(dtype=object),
+        'categorias': categorias,
+        'categoria_pool': pd.Categorical(subcategorias['Categoria_Risco'], categories=categorias).codes.astype(np.int32),
+        'frequencias': frequencias.astype(np.float64),
+        'multiplicadores': multiplicadores.astype(np.float64),
+        'amostras': np.concatenate(amostras),
+        'inicios': np.array(inicios, dtype=np.int64),
+        'tamanhos': np.array(tamanhos, dtype=np.int64),
+        'anos_observados': anos,
+        'subcategorias_sem_registro': sem_registro.index.to_numpy(dtype=object)
+    }
+
+# Função para calcular o coeficiente de perda esperada de cada risco
+#
+# A perda esperada anual do registro é a soma de
+# coeficiente * Probabilidade_Residual * (Impacto_Residual / Impacto_Residual base),
+# a mesma esperança do processo de Poisson composto simulado abaixo.
+def calcular_coeficientes_perda(df_riscos, df_incidentes):
+    anos = calcular_anos_observados(df_incidentes)
+
+    subcategorias = df_riscos.groupby('Subcategoria', sort=True).agg(
+        Categoria_Risco=('Categoria_Risco', 'first'),
+        Peso_Residual=('Probabilidade_Residual', 'sum')
+    )
+
+    frequencias = calcular_frequencias_historicas(df_incidentes, subcategorias.index, anos)
+    perdas = agrupar_perdas_historicas(df_incidentes)
+    severidades = np.array([
+        selecionar_amostras_severidade(perdas, subcategoria, categoria).mean()
+        for subcategoria, categoria in subcategorias['Categoria_Risco'].items()
+    ])
+
+    coeficientes = pd.Series(
+        frequencias * severidades / subcategorias['Peso_Residual'].to_numpy(dtype=np.float64),
+        index=subcategorias.index
+    )
+
+    return coeficientes.reindex(df_riscos['Subcategoria']).to_numpy(dtype=np.float64)
+
+# Função para calcular a perda esperada anual das subcategorias sem risco registrado, por categoria
+#
+# Essas perdas não dependem de nenhum controle do registro e entram como parcela fixa.
+def calcular_perdas_sem_registro(df_riscos, df_incidentes):
+    sem_registro = listar_subcategorias_sem_registro(df_riscos, df_incidentes)
+    if sem_registro.empty:
+        return pd.Series(dtype=np.float64)
+
+    anos = calcular_anos_observados(df_incidentes)
+    frequencias = calcular_frequencias_historicas(df_incidentes, sem_registro.index, anos)
+    perdas = agrupar_perdas_historicas(df_incidentes)
+    severidades = np.array([
+        selecionar_amostras_severidade(perdas, subcategoria, categoria).mean()
+        for subcategoria, categoria in sem_registro.items()
+    ])
+
+    return pd.Series(frequencias * severidades, index=sem_registro.index).groupby(sem_registro).sum()
+
+# Função para simular um bloco de cenários anuais
+def simular_bloco(parametros, semente, n_cenarios):
+    rng = np.random.default_rng(semente)
+    frequencias = parametros['frequencias']
+    n_pools = len(frequencias)
+
+    # Número de eventos por cenário e subcategoria
+    contagens = rng.poisson(frequencias, size=(n_cenarios, n_pools))
+    total_eventos = int(contagens.sum())
+
+    # Subcategoria e cenário de cada evento, na mesma ordem do array de contagens
+    pool_evento = np.repeat(np.tile(np.arange(n_pools, dtype=np.int32), n_cenarios), contagens.ravel())
+    cenario_evento = np.repeat(np.arange(n_cenarios, dtype=np.int32), contagens.sum(axis=1))
+
+    # Reamostrar a severidade de cada evento na distribuição histórica da sua subcategoria
+    sorteio = (rng.random(total_eventos) * parametros['tamanhos'][pool_evento]).astype(np.int64)
+    perdas_evento = parametros['amostras'][parametros['inicios'][pool_evento] + sorteio]
+    perdas_evento *= parametros['multiplicadores'][pool_evento]
+
+    perdas = np.bincount(cenario_evento, weights=perdas_evento, minlength=n_cenarios)
+    perdas_categoria = np.bincount(
+        parametros['categoria_pool'][pool_evento],
+        weights=perdas_evento,
+        minlength=len(parametros['categorias'])
+    )
+
+    return perdas, perdas_categoria
+
+# Função para calcular o tamanho de bloco que respeita o limite de eventos
+def calcular_tamanho_bloco(parametros):
+    # A matriz de contagens (cenários x pools) também cresce com o bloco: em registros
+    # esparsos ela domina a memória, então o limite vale para o maior dos dois
+    eventos_por_cenario = max(float(parametros['frequencias'].sum()), 1.0)
+    celulas_por_cenario = max(eventos_por_cenario, float(len(parametros['frequencias'])))
+    return max(1, int(LIMITE_EVENTOS_BLOCO // celulas_por_cenario))
+
+# Função para simular as perdas anuais em blocos, opcionalmente em paralelo
+def simular_perdas(parametros, n_cenarios, semente=42, tamanho_bloco=None, processos=None):
+    tamanho_bloco = tamanho_bloco or calcular_tamanho_bloco(parametros)
+
+    tamanhos_blocos = [tamanho_bloco] * (n_cenarios // tamanho_bloco)
+    if n_cenarios % tamanho_bloco:
+        tamanhos_blocos.append(n_cenarios % tamanho_bloco)
+
+    # Uma semente independente por bloco: o resultado não depende do número de processos
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos_blocos))
+
+    inicio = time.perf_counter()
+
+    if processos and processos > 1 and len(tamanhos_blocos) > 1:
+        # 'spawn' evita herdar por fork o estado de threads do processo pai (servidor do Streamlit)
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as executor:
+            resultados = list(executor.map(
+                simular_bloco,
+                [parametros] * len(tamanhos_blocos),
+                sementes,
+                tamanhos_blocos
+            ))
+    else:
+        resultados = [
+            simular_bloco(parametros, semente_bloco, tamanho)
+            for semente_bloco, tamanho in zip(sementes, tamanhos_blocos)
+        ]
+
+    duracao = time.perf_counter() - inicio
+
+    perdas = np.concatenate([perdas_bloco for perdas_bloco, _ in resultados])
+    perdas_categoria = np.sum([categoria_bloco for _, categoria_bloco in resultados], axis=0)
+
+    return {
+        'perdas': perdas,
+        'perda_esperada_categoria': pd.Series(perdas_categoria / n_cenarios, index=parametros['categorias']),
+        'duracao': duracao,
+        'cenarios_por_segundo': n_cenarios / duracao if duracao > 0 else float('inf')
+    }
+
+# Função para calcular perda esperada, VaR e CVaR
+def calcular_metricas_risco(perdas, niveis=NIVEIS_CONFIANCA):
+    metricas = {'Perda_Esperada': float(perdas.mean())}
+
+    for nivel in niveis:
+        var = float(np.quantile(perdas, nivel))
+        cauda = perdas[perdas >= var]
+        metricas[f'VaR_{nivel:.0%}'] = var
+        metricas[f'CVaR_{nivel:.0%}'] = float(cauda.mean()) if len(cauda) else var
+
+    return metricas
+
+# Função para calcular a curva de excedência de perdas
+def calcular_curva_excedencia(perdas, pontos=200):
+    perdas_ordenadas = np.sort(perdas)
+    valores = np.linspace(perdas_ordenadas[0], perdas_ordenadas[-1], pontos)
+
+    # P(L > x) pela posição de x nas perdas ordenadas
+    probabilidades = 1 - np.searchsorted(perdas_ordenadas, valores, side='right') / len(perdas_ordenadas)
+
+    return pd.DataFrame({
+        'Valor_Perda': valores,
+        'Probabilidade_Excedencia': probabilidades
+    })
+
+# Função para medir o desempenho da simulação em cenários por segundo
+def medir_desempenho(df_riscos, df_incidentes, n_cenarios, semente=42, processos=None, tamanho_bloco=None):
+    parametros = preparar_parametros(df_riscos, df_incidentes)
+    resultado = simular_perdas(parametros, n_cenarios, semente, tamanho_bloco, processos)
+
+    return {
+        'cenarios': n_cenarios,
+        'processos': processos or 1,
+        'duracao': resultado['duracao'],
+        'cenarios_por_segundo': resultado['cenarios_por_segundo']
+    }
+
+# Executar o benchmark de desempenho pela linha de comando
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da simulação Monte Carlo de perdas")
+    parser.add_argument("--cenarios", type=int, default=1_000_000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--processos", type=int, default=1)
+    parser.add_argument("--bloco", type=int, default=None)
+    parser.add_argument("--dados", default="dados")
+    args = parser.parse_args()
+
+    df_riscos = pd.read_csv(os.path.join(args.dados, "analise_riscos.csv"))
+    df_incidentes = pd.read_csv(os.path.join(args.dados, "registro_incidentes.csv"))
+
+    desempenho = medir_desempenho(df_riscos, df_incidentes, args.cenarios, args.semente, args.processos, args.bloco)
+
+    print(f"Cenários: {desempenho['cenarios']:,}")
+    print(f"Processos: {desempenho['processos']}")
+    print(f"Duração: {desempenho['duracao']:.2f} s")
+    print(f"Throughput: {desempenho['cenarios_por_segundo']:,.0f} cenários/s")